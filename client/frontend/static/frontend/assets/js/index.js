@@ -23,7 +23,7 @@ var mix = {
 		getLimitedProducts() {
 			this.getData("/api/products/limited/")
 				.then(data => {
-					this.limitedCards = data
+					this.limitedCards = data.items
 				}).catch(() => {
 				this.limitedCards = []
 				console.warn('Ошибка при получении списка лимитированных товаров')
@@ -2,14 +2,16 @@ from rest_framework import serializers
 
 from product.models import Product
 from tags.serializers import TagSerializer
-from product.serializers import ProductImageSerializers
+from product.serializers import EagerLoadingMixin, ProductImageSerializers
 
 
-class ProductInBasketSerializer(serializers.ModelSerializer):
+class ProductInBasketSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    prefetch_related_fields = ("images", "tags")
+
     images = serializers.SerializerMethodField(method_name="get_product_images")
     tags = serializers.SerializerMethodField(method_name="get_tags")
     reviews = serializers.IntegerField(source="reviews_count", read_only=True)
-    rating = serializers.FloatField(source="average_rating", read_only=True)
+    rating = serializers.FloatField(read_only=True)
     count = serializers.SerializerMethodField(method_name="get_count")
 
     class Meta:
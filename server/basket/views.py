@@ -29,8 +29,11 @@ class BasketView(APIView):
         Возвращает содержимое корзины.
         """
         basket = self.get_basket(request)
-        basket_items = {item.product.id: item for item in basket.basket_items.all()}
-        products = [item.product for item in basket.basket_items.all()]
+        items = ProductInBasketSerializer.setup_eager_loading(
+            basket.basket_items.select_related("product"), prefix="product__"
+        )
+        basket_items = {item.product.id: item for item in items}
+        products = [item.product for item in basket_items.values()]
         serializer = ProductInBasketSerializer(
             products, many=True, context={"basket_items": basket_items}
         )
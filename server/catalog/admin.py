@@ -1,5 +1,5 @@
 from django.contrib import admin
-from catalog.models import Category, CategoryImage
+from catalog.models import Banner, Category, CategoryImage
 
 
 @admin.register(CategoryImage)
@@ -18,3 +18,12 @@ class CategoryAdmin(admin.ModelAdmin):
     autocomplete_fields = ("parent", "image")
     list_per_page = 20
     ordering = ("id",)
+
+
+@admin.register(Banner)
+class BannerAdmin(admin.ModelAdmin):
+    list_display = ("id", "product", "position", "is_active")
+    list_editable = ("position", "is_active")
+    list_filter = ("is_active",)
+    autocomplete_fields = ("product",)
+    ordering = ("position", "id")
@@ -0,0 +1,53 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from catalog.models import Banner
+from catalog.cache import lookup_timeout
+from server.renderers import FastJSONRenderer
+from server.db_routing import primary_reads
+from product.popularity import top_products
+from product.serializers import ProductShortSerializers
+
+BANNERS_CACHE_KEY = "catalog:banners"
+
+
+def banner_products() -> list:
+    """
+    Товары активных баннеров в порядке позиций. Пока баннеры не
+    настроены в админке, выводятся самые популярные товары.
+    """
+    banners = ProductShortSerializers.setup_eager_loading(
+        Banner.objects.filter(is_active=True).select_related("product"),
+        prefix="product__",
+    )
+    products = [banner.product for banner in banners]
+    if products:
+        return products
+
+    limit = getattr(settings, "CATALOG_BANNERS_FALLBACK_LIMIT", 3)
+    return list(ProductShortSerializers.setup_eager_loading(top_products(limit)))
+
+
+def build_banners() -> dict:
+    """
+    Сериализует баннеры в готовое JSON-тело ответа и сохраняет его в кэш.
+    """
+    with primary_reads():
+        data = ProductShortSerializers(banner_products(), many=True).data
+    body = FastJSONRenderer().render(data)
+    payload = {"body": body, "etag": f'"{hashlib.md5(body).hexdigest()}"'}
+    cache.set(BANNERS_CACHE_KEY, payload, lookup_timeout())
+    return payload
+
+
+def get_banners() -> dict:
+    payload = cache.get(BANNERS_CACHE_KEY)
+    if payload is None:
+        payload = build_banners()
+    return payload
+
+
+def invalidate_banners() -> None:
+    cache.delete(BANNERS_CACHE_KEY)
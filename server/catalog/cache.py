@@ -0,0 +1,183 @@
+import json
+import time
+import random
+import hashlib
+from typing import Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+
+from tags.models import Tag
+from catalog.models import Category
+from server.db_routing import primary_reads
+
+COUNT_CACHE_NAMESPACE = "catalog:count"
+FACET_CACHE_NAMESPACE = "catalog:facets"
+RESPONSE_CACHE_NAMESPACE = "catalog:response"
+SALES_CACHE_NAMESPACE = "catalog:sales"
+CATEGORY_CACHE_NAMESPACE = "catalog:categories"
+TAG_IDS_CACHE_KEY = "catalog:tag-ids"
+
+
+def generation_key(namespace: str) -> str:
+    return f"{namespace}:generation"
+
+
+def get_generation(namespace: str) -> int:
+    """
+    Текущее поколение пространства имён кэша.
+    Ключи, собранные с устаревшим поколением, просто перестают читаться.
+    """
+    key = generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(namespace: str) -> None:
+    """
+    Инвалидирует все ключи пространства имён без их перебора.
+    Новое поколение записывается, а не увеличивается через incr: у бэкендов
+    с неатомарным incr два одновременных сброса дали бы одно значение.
+    """
+    cache.set(generation_key(namespace), time.time_ns(), timeout=None)
+
+
+def lookup_timeout() -> int:
+    """
+    TTL справочных ключей: ограничивает устаревание, если сброс из другого
+    процесса не дошёл до этого кэша (LocMemCache).
+    """
+    return getattr(settings, "CATALOG_LOOKUP_CACHE_TIMEOUT", 300)
+
+
+def make_key(namespace: str, *parts) -> str:
+    """
+    Ключ кэша из текущего поколения и хэша произвольных JSON-совместимых частей.
+    """
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f"{namespace}:{get_generation(namespace)}:{digest}"
+
+
+def normalize_params(query_params, params: Iterable[str]) -> dict:
+    """
+    Нормализованный набор параметров запроса: без пустых значений,
+    в нижнем регистре и с отсортированными множественными значениями.
+    """
+    normalized = {}
+    for param in params:
+        values = sorted(
+            value.strip().lower()
+            for value in query_params.getlist(param)
+            + query_params.getlist(f"{param}[]")
+            if value.strip()
+        )
+        if values:
+            normalized[param] = values
+    return normalized
+
+
+def canonical_query(query_params) -> list:
+    """
+    Параметры запроса в каноническом виде: порядок ключей и значений не важен.
+    """
+    return sorted((key, sorted(values)) for key, values in query_params.lists())
+
+
+def get_tag_id_map() -> dict:
+    """
+    Словарь «имя тега в нижнем регистре → список id», хранится в кэше
+    до изменения тегов (см. catalog.signals), но не дольше lookup_timeout.
+    """
+    tag_ids = cache.get(TAG_IDS_CACHE_KEY)
+    if tag_ids is None:
+        tag_ids = {}
+        with primary_reads():
+            for tag_id, name in Tag.objects.values_list("id", "name"):
+                tag_ids.setdefault(name.lower(), []).append(tag_id)
+        cache.set(TAG_IDS_CACHE_KEY, tag_ids, lookup_timeout())
+    return tag_ids
+
+
+def get_tag_ids(values: Iterable[str]) -> List[List[int]]:
+    """
+    Id тегов для каждого значения фильтра: сначала значение ищется по
+    имени, число без совпадения по имени считается id (так теги передаёт
+    фронтенд). Для неизвестного имени список пуст.
+    """
+    tag_ids = get_tag_id_map()
+    groups = []
+    for value in values:
+        value = value.strip()
+        if value.lower() in tag_ids:
+            groups.append(tag_ids[value.lower()])
+        elif value.isdigit():
+            groups.append([int(value)])
+        else:
+            groups.append([])
+    return groups
+
+
+def invalidate_tag_ids() -> None:
+    cache.delete(TAG_IDS_CACHE_KEY)
+
+
+def get_subtree_ids(category_id: int) -> List[int]:
+    """
+    Id категории и всех её потомков. Поддерево читается одним запросом
+    по материализованному пути и хранится в кэше до изменения категорий.
+    """
+    key = make_key(CATEGORY_CACHE_NAMESPACE, "subtree", category_id)
+    ids = cache.get(key)
+    if ids is None:
+        with primary_reads():
+            category = Category.objects.filter(id=category_id).only("path").first()
+            ids = []
+            if category is not None:
+                ids = list(
+                    Category.objects.subtree(category).values_list("id", flat=True)
+                )
+        cache.set(key, ids, lookup_timeout())
+    return ids
+
+
+def stats_key(namespace: str, event: str) -> str:
+    return f"{namespace}:stats:{event}"
+
+
+def record_event(namespace: str, event: str, sampled: bool = False) -> None:
+    """
+    Увеличивает счётчик события кэша (hits, misses, invalidations).
+    Частые события (``sampled``) пишутся с долей
+    CATALOG_CACHE_STATS_SAMPLE_RATE и весом 1/доля, чтобы попадание
+    в кэш не превращалось в запись при каждом запросе.
+    """
+    delta = 1
+    if sampled:
+        rate = getattr(settings, "CATALOG_CACHE_STATS_SAMPLE_RATE", 1.0)
+        if rate <= 0 or random.random() >= rate:
+            return
+        delta = round(1 / rate)
+
+    key = stats_key(namespace, event)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def get_stats(namespace: str) -> dict:
+    counters = cache.get_many(
+        [stats_key(namespace, event) for event in ("hits", "misses", "invalidations")]
+    )
+    stats = {
+        event: counters.get(stats_key(namespace, event), 0)
+        for event in ("hits", "misses", "invalidations")
+    }
+    requests = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / requests if requests else 0.0
+    return stats
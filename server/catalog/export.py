@@ -0,0 +1,101 @@
+import csv
+import json
+from typing import Dict, Iterator
+
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
+
+from product.models import Product, Sale
+
+CSV_FIELDS = (
+    "id",
+    "title",
+    "category",
+    "price",
+    "effective_price",
+    "count",
+    "freeDelivery",
+    "rating",
+    "reviews",
+    "images",
+    "tags",
+    "salePrice",
+    "saleDateFrom",
+    "saleDateTo",
+)
+
+
+class Echo:
+    """
+    Буфер для csv.writer, который сразу возвращает записанную строку.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_queryset(moment=None):
+    moment = moment or timezone.now()
+    return (
+        Product.objects.order_by("id")
+        .select_related("category")
+        .prefetch_related(
+            "images",
+            "tags",
+            Prefetch(
+                "sales",
+                queryset=Sale.objects.active(moment).order_by("salePrice", "id"),
+                to_attr="active_sales",
+            ),
+        )
+    )
+
+
+def export_rows(chunk_size: int) -> Iterator[Dict]:
+    """
+    Товары каталога по одному словарю на товар. Читаются пачками по
+    ``chunk_size`` с prefetch на каждую пачку, так что память не растёт
+    вместе с каталогом.
+    """
+    for product in export_queryset().iterator(chunk_size=chunk_size):
+        sale = None
+        if product.active_sales:
+            best = product.active_sales[0]
+            sale = {
+                "salePrice": best.salePrice,
+                "dateFrom": best.dateFrom,
+                "dateTo": best.dateTo,
+            }
+        yield {
+            "id": product.id,
+            "title": product.title,
+            "category": product.category.title,
+            "price": product.price,
+            "effective_price": product.effective_price,
+            "count": product.count,
+            "freeDelivery": product.freeDelivery,
+            "rating": product.rating,
+            "reviews": product.reviews_count,
+            "images": [image.src.url for image in product.images.all()],
+            "tags": [tag.name for tag in product.tags.all()],
+            "sale": sale,
+        }
+
+
+def export_ndjson(chunk_size: int) -> Iterator[str]:
+    for row in export_rows(chunk_size):
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def export_csv(chunk_size: int) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_FIELDS)
+    for row in export_rows(chunk_size):
+        sale = row.pop("sale") or {}
+        row["images"] = "|".join(row["images"])
+        row["tags"] = "|".join(row["tags"])
+        row["salePrice"] = sale.get("salePrice")
+        row["saleDateFrom"] = sale.get("dateFrom")
+        row["saleDateTo"] = sale.get("dateTo")
+        yield writer.writerow([row[field] for field in CSV_FIELDS])
@@ -0,0 +1,91 @@
+from decimal import Decimal
+from typing import Dict, List
+
+from django.db.models import Count, Max, Min, Q
+
+from product.models import Product
+
+PRICE_QUANTUM = Decimal("0.01")
+
+
+def price_edges(min_price: Decimal, max_price: Decimal, buckets: int) -> List[Decimal]:
+    if min_price == max_price:
+        return [min_price, max_price]
+    width = (max_price - min_price) / buckets
+    inner = [(min_price + width * i).quantize(PRICE_QUANTUM) for i in range(1, buckets)]
+    return [min_price, *inner, max_price]
+
+
+def price_histogram(queryset, min_price, max_price, buckets: int) -> List[Dict]:
+    """
+    Гистограмма цен с учётом действующих скидок: все корзины
+    считаются одним запросом через условные агрегаты.
+    """
+    if min_price is None:
+        return []
+
+    edges = price_edges(min_price, max_price, buckets)
+    ranges = list(zip(edges, edges[1:]))
+    aggregates = {}
+    for i, (low, high) in enumerate(ranges):
+        upper = (
+            Q(effective_price__lte=high)
+            if i == len(ranges) - 1
+            else Q(effective_price__lt=high)
+        )
+        aggregates[f"bucket_{i}"] = Count(
+            "id", filter=Q(effective_price__gte=low) & upper, distinct=True
+        )
+    counts = queryset.aggregate(**aggregates)
+
+    return [
+        {"from": str(low), "to": str(high), "count": counts[f"bucket_{i}"]}
+        for i, (low, high) in enumerate(ranges)
+    ]
+
+
+def tag_counts(queryset) -> List[Dict]:
+    """
+    Количество товаров по тегам среди отфильтрованных товаров.
+    Считается по таблице связей одним запросом с группировкой по тегу.
+    """
+    rows = (
+        Product.tags.through.objects.filter(product__in=queryset.values("id"))
+        .values("tag_id", "tag__name")
+        .annotate(count=Count("product_id", distinct=True))
+        .order_by("-count", "tag__name")
+    )
+    return [
+        {"id": row["tag_id"], "name": row["tag__name"], "count": row["count"]}
+        for row in rows
+    ]
+
+
+def compute_facets(queryset, buckets: int, tag_queryset=None) -> Dict:
+    """
+    Фасеты выдачи ``queryset``. Теги считаются по ``tag_queryset`` —
+    выдаче без фильтра по тегам, чтобы выбор тега не скрывал остальные.
+    """
+    stats = queryset.aggregate(
+        total=Count("id", distinct=True),
+        min_price=Min("effective_price"),
+        max_price=Max("effective_price"),
+        free_delivery=Count("id", filter=Q(freeDelivery=True), distinct=True),
+        available=Count("id", filter=Q(count__gt=0), distinct=True),
+    )
+    min_price, max_price = stats["min_price"], stats["max_price"]
+    if min_price is not None:
+        min_price = Decimal(min_price).quantize(PRICE_QUANTUM)
+        max_price = Decimal(max_price).quantize(PRICE_QUANTUM)
+
+    return {
+        "total": stats["total"],
+        "price": {
+            "min": None if min_price is None else str(min_price),
+            "max": None if max_price is None else str(max_price),
+            "histogram": price_histogram(queryset, min_price, max_price, buckets),
+        },
+        "freeDelivery": stats["free_delivery"],
+        "available": stats["available"],
+        "tags": tag_counts(queryset if tag_queryset is None else tag_queryset),
+    }
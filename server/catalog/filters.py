@@ -1,21 +1,84 @@
 import django_filters
+from django.db.models import Exists, OuterRef
+from django_filters.widgets import QueryArrayWidget
 
-from tags.models import Tag
+from product.models import Product
+from catalog.cache import get_subtree_ids, get_tag_ids
+from product.search import search_products
 
 
 class CatalogFilter(django_filters.FilterSet):
-    name = django_filters.CharFilter(field_name="title", lookup_expr="icontains")
-    minPrice = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
-    maxPrice = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
+    TAGS_MODE_CHOICES = (("or", "or"), ("and", "and"))
+
+    name = django_filters.CharFilter(method="filter_name")
+    category = django_filters.NumberFilter(method="filter_category")
+    minPrice = django_filters.NumberFilter(
+        field_name="effective_price", lookup_expr="gte"
+    )
+    maxPrice = django_filters.NumberFilter(
+        field_name="effective_price", lookup_expr="lte"
+    )
     freeDelivery = django_filters.BooleanFilter(
         field_name="freeDelivery", lookup_expr="exact"
     )
     available = django_filters.BooleanFilter(method="filter_available")
-    tags = django_filters.ModelMultipleChoiceFilter(
-        queryset=Tag.objects.all(), field_name="tags__name", to_field_name="name"
+    tags = django_filters.Filter(method="filter_tags", widget=QueryArrayWidget)
+    tagsMode = django_filters.ChoiceFilter(
+        choices=TAGS_MODE_CHOICES, method="filter_tags_mode"
     )
 
+    def filter_queryset_without(self, *names):
+        """
+        Выборка по всем фильтрам, кроме ``names``: для фасета, который
+        не должен сужаться собственным фильтром.
+        """
+        queryset = self.queryset.all()
+        for name, value in self.form.cleaned_data.items():
+            if name not in names:
+                queryset = self.filters[name].filter(queryset, value)
+        return queryset
+
+    def filter_name(self, queryset, name, value):
+        return search_products(queryset, value)
+
+    def filter_category(self, queryset, name, value):
+        """
+        Товары категории и всех её подкатегорий.
+        """
+        return queryset.filter(category_id__in=get_subtree_ids(int(value)))
+
     def filter_available(self, queryset, name, value):
         if value:
             return queryset.filter(count__gt=0)
         return queryset
+
+    def filter_tags(self, queryset, name, value):
+        """
+        Фильтр по тегам через EXISTS по таблице связей, без JOIN и
+        дублирования строк. Значения из цифр считаются id тега, остальные
+        переводятся в id по закэшированному словарю имён. В режиме ``and``
+        товар должен иметь все теги, в режиме ``or`` (по умолчанию) любой.
+        """
+        tag_groups = get_tag_ids(value)
+        if self.form.cleaned_data.get("tagsMode") == "and":
+            if not all(tag_groups):
+                return queryset.none()
+            for tag_ids in tag_groups:
+                queryset = queryset.filter(self.has_tags(tag_ids))
+            return queryset
+
+        tag_ids = [tag_id for tag_ids in tag_groups for tag_id in tag_ids]
+        if not tag_ids:
+            return queryset.none()
+        return queryset.filter(self.has_tags(tag_ids))
+
+    def filter_tags_mode(self, queryset, name, value):
+        return queryset
+
+    @staticmethod
+    def has_tags(tag_ids) -> Exists:
+        return Exists(
+            Product.tags.through.objects.filter(
+                product_id=OuterRef("pk"), tag_id__in=tag_ids
+            )
+        )
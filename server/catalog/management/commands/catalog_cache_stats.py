@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from catalog.cache import RESPONSE_CACHE_NAMESPACE, get_stats
+
+
+class Command(BaseCommand):
+    help = "Выводит статистику кэша ответов каталога."
+
+    def handle(self, *args, **options):
+        stats = get_stats(RESPONSE_CACHE_NAMESPACE)
+        self.stdout.write(f"hits: {stats['hits']}")
+        self.stdout.write(f"misses: {stats['misses']}")
+        self.stdout.write(f"invalidations: {stats['invalidations']}")
+        self.stdout.write(f"hit ratio: {stats['hit_ratio']:.2%}")
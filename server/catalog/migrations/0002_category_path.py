@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:24
+
+from django.db import migrations, models
+
+
+def fill_category_paths(apps, schema_editor):
+    Category = apps.get_model("catalog", "Category")
+    level = list(Category.objects.filter(parent__isnull=True))
+    paths = {}
+    depth = 0
+    while level:
+        for category in level:
+            category.path = paths.get(category.parent_id, "") + f"{category.pk:010d}/"
+            category.depth = depth
+            paths[category.pk] = category.path
+        Category.objects.bulk_update(level, ["path", "depth"])
+        level = list(Category.objects.filter(parent_id__in=[c.pk for c in level]))
+        depth += 1
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(fill_category_paths, migrations.RunPython.noop),
+    ]
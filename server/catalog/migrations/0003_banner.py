@@ -0,0 +1,49 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0002_category_path"),
+        ("product", "0008_sale_period_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Banner",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("position", models.PositiveSmallIntegerField(default=0)),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="banners",
+                        to="product.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Banner",
+                "verbose_name_plural": "Banners",
+                "ordering": ("position", "id"),
+                "indexes": [
+                    models.Index(
+                        fields=["is_active", "position"], name="banner_position_idx"
+                    )
+                ],
+            },
+        ),
+    ]
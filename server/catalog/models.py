@@ -1,5 +1,10 @@
+from typing import List
+
 from django.db import models
+from django.db.models import F, Value
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db.models.functions import Concat, Substr
 
 
 class CategoryImage(models.Model):
@@ -7,7 +12,46 @@ class CategoryImage(models.Model):
     alt = models.CharField(max_length=100)
 
 
+class CategoryQuerySet(models.QuerySet):
+    def subtree(self, category: "Category") -> "CategoryQuerySet":
+        """
+        Категория и все её потомки одним диапазонным запросом по пути.
+        Категория без пути (создана bulk_create) отдаётся без потомков:
+        пустой префикс совпал бы со всеми строками.
+        """
+        if not category.path:
+            return self.filter(pk=category.pk)
+        return self.filter(path__startswith=category.path)
+
+    def as_tree(self) -> List["Category"]:
+        """
+        Загружает категории одним запросом и связывает их в дерево в памяти.
+        У каждой категории дочерние элементы доступны в ``tree_children``.
+        """
+        return self.link_tree(list(self.select_related("image").order_by("id")))
+
+    async def aas_tree(self) -> List["Category"]:
+        """
+        Асинхронный вариант as_tree.
+        """
+        nodes = [node async for node in self.select_related("image").order_by("id")]
+        return self.link_tree(nodes)
+
+    @staticmethod
+    def link_tree(nodes: List["Category"]) -> List["Category"]:
+        nodes_by_id = {node.id: node for node in nodes}
+        for node in nodes:
+            node.tree_children = []
+        for node in nodes:
+            parent = nodes_by_id.get(node.parent_id)
+            if parent is not None:
+                parent.tree_children.append(node)
+        return nodes
+
+
 class Category(models.Model):
+    PATH_SEGMENT_LENGTH = 11
+
     title = models.CharField(max_length=100)
     image = models.ForeignKey(
         CategoryImage,
@@ -23,6 +67,10 @@ class Category(models.Model):
         related_name="subcategories",
         on_delete=models.CASCADE,
     )
+    path = models.CharField(max_length=255, db_index=True, editable=False, default="")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = CategoryQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = "Catalogs"
@@ -30,3 +78,66 @@ class Category(models.Model):
 
     def __str__(self):
         return self.title
+
+    @staticmethod
+    def path_segment(pk: int) -> str:
+        return f"{pk:010d}/"
+
+    def get_parent_path(self) -> str:
+        if self.parent_id is None:
+            return ""
+        return (
+            Category.objects.filter(pk=self.parent_id)
+            .values_list("path", flat=True)
+            .get()
+        )
+
+    def clean(self):
+        if self.pk and self.parent_id and self.get_parent_path().startswith(self.path):
+            raise ValidationError({"parent": "Category cannot be nested into itself."})
+
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет категорию и поддерживает материализованный путь
+        (``0000000001/0000000004/``) и глубину у неё и всех потомков.
+        """
+        parent_path = self.get_parent_path()
+        old_path, old_depth = self.path, self.depth
+        if old_path and parent_path.startswith(old_path):
+            raise ValueError("Category cannot be nested into itself.")
+
+        super().save(*args, **kwargs)
+
+        path = parent_path + self.path_segment(self.pk)
+        if path == old_path:
+            return
+
+        depth = len(path) // self.PATH_SEGMENT_LENGTH - 1
+        Category.objects.filter(pk=self.pk).update(path=path, depth=depth)
+        if old_path:
+            Category.objects.filter(path__startswith=old_path).exclude(
+                pk=self.pk
+            ).update(
+                path=Concat(Value(path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + (depth - old_depth),
+            )
+        self.path, self.depth = path, depth
+
+
+class Banner(models.Model):
+    product = models.ForeignKey(
+        "product.Product", related_name="banners", on_delete=models.CASCADE
+    )
+    position = models.PositiveSmallIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Banner"
+        verbose_name_plural = "Banners"
+        ordering = ("position", "id")
+        indexes = [
+            models.Index(fields=["is_active", "position"], name="banner_position_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.position}: {self.product_id}"
@@ -1,7 +1,96 @@
+import json
+import base64
+import asyncio
+import binascii
+from functools import partial
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db import connection
+from asgiref.sync import sync_to_async
+from django.utils.functional import cached_property
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 
+from server.db_routing import primary_reads
+from catalog.cache import COUNT_CACHE_NAMESPACE, make_key, normalize_params
+
+
+def estimate_table_rows(model) -> Optional[int]:
+    """
+    Приблизительное количество строк по статистике таблицы (только MySQL/MariaDB).
+    """
+    if connection.vendor != "mysql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else None
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который берёт общее количество объектов из кэша,
+    а для нефильтрованной выдачи может использовать оценку по статистике.
+    """
+
+    def __init__(self, object_list, per_page, count_key=None, estimate=False, **kw):
+        super().__init__(object_list, per_page, **kw)
+        self.count_key = count_key
+        self.estimate = estimate
+
+    @cached_property
+    def count(self) -> int:
+        if self.estimate:
+            estimated = estimate_table_rows(self.object_list.model)
+            if estimated is not None:
+                return estimated
+
+        if self.count_key is None:
+            return super().count
+
+        count = cache.get(self.count_key)
+        if count is None:
+            with primary_reads():
+                count = super().count
+            cache.set(
+                self.count_key,
+                count,
+                getattr(settings, "CATALOG_COUNT_CACHE_TIMEOUT", 60),
+            )
+        return count
+
+    async def acount(self) -> int:
+        """
+        Асинхронный вариант count; результат сохраняется в ``count``.
+        """
+        count = None
+        if self.estimate:
+            count = await sync_to_async(estimate_table_rows)(self.object_list.model)
+        if count is None and self.count_key is not None:
+            count = await cache.aget(self.count_key)
+        if count is None:
+            with primary_reads():
+                count = await self.object_list.acount()
+            if self.count_key is not None:
+                await cache.aset(
+                    self.count_key,
+                    count,
+                    getattr(settings, "CATALOG_COUNT_CACHE_TIMEOUT", 60),
+                )
+        self.count = count
+        return count
+
 
 class SalePagination(PageNumberPagination):
     page_size = 10
@@ -19,12 +108,54 @@ class SalePagination(PageNumberPagination):
 
 
 class CustomPagination(PageNumberPagination):
+    """
+    Постраничная пагинация каталога.
+
+    При наличии параметра ``cursor`` включается keyset-режим: выборка
+    продолжается после последнего товара предыдущей страницы по ключу
+    сортировки и ``id``, без OFFSET и без подсчёта общего количества.
+    """
+
     page_size = 20
     page_query_param = "currentPage"
     page_size_query_param = "limit"
     max_page_size = 100
+    cursor_query_param = "cursor"
+    count_filter_params = (
+        "name",
+        "category",
+        "minPrice",
+        "maxPrice",
+        "freeDelivery",
+        "available",
+        "tags",
+        "tagsMode",
+    )
+    # Допустимые ключи сортировки: у каждого поля есть индекс (поле, id),
+    # relevance доступна только вместе с поисковым запросом.
+    sort_fields = {
+        "price": "effective_price",
+        "date": "date",
+        "rating": "rating",
+        "reviews": "reviews_count",
+        "title": "title",
+        "relevance": "relevance",
+    }
+    sort_types = {"dec": True, "inc": False}
+
+    cursor_mode = False
+    next_cursor = None
 
     def get_paginated_response(self, data) -> Response:
+        if self.cursor_mode:
+            return Response(
+                {
+                    "items": data,
+                    "nextCursor": self.next_cursor,
+                    "pageSize": self.cursor_page_size,
+                }
+            )
+
         return Response(
             {
                 "items": data,
@@ -35,6 +166,74 @@ class CustomPagination(PageNumberPagination):
         )
 
     def paginate_queryset(self, queryset, request, view=None):
+        limit = self.get_limit(request)
+        sort_field, descending = self.get_sort(request)
+
+        if self.cursor_query_param in request.query_params:
+            queryset, field = self.get_cursor_queryset(
+                queryset,
+                request.query_params[self.cursor_query_param],
+                sort_field,
+                descending,
+                limit,
+            )
+            return self.get_cursor_page(
+                list(queryset[: limit + 1]), field, descending, limit
+            )
+
+        queryset = self.get_sorted_queryset(queryset, sort_field, descending)
+        self.django_paginator_class = partial(
+            CachedCountPaginator, **self.get_count_options(request, queryset)
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Асинхронный вариант paginate_queryset. Общее количество и строки
+        страницы запрашиваются одновременно; номер страницы проверяется
+        после подсчёта, как в PageNumberPagination.
+        """
+        limit = self.get_limit(request)
+        sort_field, descending = self.get_sort(request)
+
+        if self.cursor_query_param in request.query_params:
+            queryset, field = self.get_cursor_queryset(
+                queryset,
+                request.query_params[self.cursor_query_param],
+                sort_field,
+                descending,
+                limit,
+            )
+            items = [item async for item in queryset[: limit + 1]]
+            return self.get_cursor_page(items, field, descending, limit)
+
+        queryset = self.get_sorted_queryset(queryset, sort_field, descending)
+        self.request = request
+        # Ключ подсчёта читает поколение из кэша синхронно.
+        count_options = await sync_to_async(self.get_count_options)(request, queryset)
+        paginator = CachedCountPaginator(
+            queryset, self.get_page_size(request), **count_options
+        )
+        number = int(request.query_params.get(self.page_query_param) or 1)
+        offset = (number - 1) * paginator.per_page
+
+        async def fetch_rows():
+            return [row async for row in queryset[offset : offset + paginator.per_page]]
+
+        _, rows = await asyncio.gather(paginator.acount(), fetch_rows())
+        try:
+            paginator.validate_number(number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(page_number=number, message=str(exc))
+            )
+        self.page = Page(rows, number, paginator)
+        return rows
+
+    def get_limit(self, request) -> int:
+        """
+        Проверяет номер страницы и размер страницы из параметров запроса.
+        """
         current_page = request.query_params.get(self.page_query_param, None)
         limit = request.query_params.get(self.page_size_query_param, None)
 
@@ -50,12 +249,141 @@ class CustomPagination(PageNumberPagination):
                     raise ValidationError()
         except ValueError:
             raise ValidationError()
+        return limit or self.page_size
 
-        sort_field = request.query_params.get("sort", None)
-        sort_type = request.query_params.get("sortType", "dec")
+    def get_sorted_queryset(self, queryset, sort_field: Optional[str], descending):
+        if sort_field == "relevance" and "relevance" not in queryset.query.annotations:
+            sort_field = None
 
         if sort_field:
-            sort_prefix = "-" if sort_type == "dec" else ""
-            queryset = queryset.order_by(f"{sort_prefix}{sort_field}")
+            return queryset.order_by(
+                *self.get_ordering(self.sort_fields[sort_field], descending)
+            )
+        if not queryset.ordered:
+            return queryset.order_by("id")
+        return queryset
 
-        return super().paginate_queryset(queryset, request, view)
+    def get_count_options(self, request, queryset) -> dict:
+        """
+        Оценка по статистике таблицы верна только для выборки без условий:
+        ни параметров запроса, ни фильтров самого представления.
+        """
+        filters = self.get_count_filters(request)
+        return {
+            "count_key": self.get_count_key(request, filters),
+            "estimate": not filters
+            and not queryset.query.where
+            and getattr(settings, "CATALOG_ESTIMATED_COUNT", False),
+        }
+
+    def get_sort(self, request) -> Tuple[Optional[str], bool]:
+        """
+        Ключ сортировки из реестра ``sort_fields`` и её направление.
+        Неизвестные значения отклоняются, а не передаются в ORDER BY.
+        """
+        sort_field = request.query_params.get("sort") or None
+        sort_type = request.query_params.get("sortType", "dec")
+        if sort_field is not None and sort_field not in self.sort_fields:
+            raise ValidationError({"sort": "Unknown sort key."})
+        if sort_type not in self.sort_types:
+            raise ValidationError({"sortType": "Expected 'dec' or 'inc'."})
+        return sort_field, self.sort_types[sort_type]
+
+    @staticmethod
+    def get_ordering(field: str, descending: bool) -> list:
+        """
+        Сортировка по полю с id для однозначного порядка внутри равных значений.
+        """
+        prefix = "-" if descending else ""
+        ordering = [f"{prefix}{field}"]
+        if field != "id":
+            ordering.append(f"{prefix}id")
+        return ordering
+
+    def get_count_filters(self, request) -> dict:
+        """
+        Нормализованный набор фильтров, от которого зависит общее количество.
+        """
+        return normalize_params(request.query_params, self.count_filter_params)
+
+    def get_count_key(self, request, filters: dict) -> str:
+        return make_key(COUNT_CACHE_NAMESPACE, request.path, filters)
+
+    def get_cursor_queryset(
+        self,
+        queryset,
+        cursor: str,
+        sort_field: Optional[str],
+        descending: bool,
+        limit: int,
+    ):
+        """
+        Keyset-пагинация: WHERE (key, id) < (value, last_id) по индексу
+        вместо OFFSET, поэтому глубокие страницы стоят столько же, сколько первая.
+        Возвращает отсортированный queryset и поле ключа.
+        """
+        if sort_field is None:
+            field = "id"
+        elif sort_field != "relevance":
+            field = self.sort_fields[sort_field]
+        else:
+            raise ValidationError({"sort": "Unsupported sort for cursor pagination."})
+
+        self.cursor_mode = True
+        self.cursor_page_size = limit
+        queryset = queryset.order_by(*self.get_ordering(field, descending))
+        fields = queryset.query.values_select
+        if fields and field not in fields:
+            # Строки values() должны содержать ключ сортировки для курсора.
+            queryset = queryset.values(*fields, field)
+
+        if cursor:
+            value, last_id = self.decode_cursor(
+                cursor, queryset.model, field, descending
+            )
+            lookup = "lt" if descending else "gt"
+            if field == "id":
+                queryset = queryset.filter(**{f"id__{lookup}": last_id})
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{field}__{lookup}": value})
+                    | Q(**{field: value, f"id__{lookup}": last_id})
+                )
+        return queryset, field
+
+    def get_cursor_page(self, items: list, field: str, descending: bool, limit: int):
+        """
+        Отбрасывает лишнюю запись, запрошенную сверх ``limit``, и строит
+        по последней записи страницы курсор следующей.
+        """
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            if not isinstance(last, dict):
+                last = {field: getattr(last, field), "id": last.id}
+            self.next_cursor = self.encode_cursor(
+                field, descending, last[field], last["id"]
+            )
+        return items
+
+    @staticmethod
+    def encode_cursor(field: str, descending: bool, value, last_id: int) -> str:
+        payload = {"f": field, "d": descending, "v": str(value), "id": last_id}
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, cursor: str, model, field: str, descending: bool) -> Tuple:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if payload["f"] != field or payload["d"] != descending:
+                raise ValueError()
+            model_field = model._meta.get_field(field)
+            return model_field.to_python(payload["v"]), int(payload["id"])
+        except (
+            binascii.Error,
+            KeyError,
+            TypeError,
+            ValueError,
+            DjangoValidationError,
+        ):
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
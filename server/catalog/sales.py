@@ -0,0 +1,58 @@
+import math
+from datetime import datetime
+from typing import Optional
+
+from django.db.models import Min, Q
+from django.core.cache import cache
+from django.utils import timezone
+
+from product.models import Sale
+from server.db_routing import primary_reads
+from catalog.cache import SALES_CACHE_NAMESPACE, lookup_timeout, make_key
+
+
+def next_boundary(moment) -> Optional[datetime]:
+    """
+    Ближайший момент после ``moment``, когда состав действующих
+    скидок изменится: начало будущей или окончание текущей скидки.
+    """
+    bounds = Sale.objects.aggregate(
+        next_start=Min("dateFrom", filter=Q(dateFrom__gt=moment)),
+        next_end=Min("dateTo", filter=Q(dateFrom__lte=moment, dateTo__gte=moment)),
+    )
+    candidates = [value for value in bounds.values() if value is not None]
+    return min(candidates) if candidates else None
+
+
+def build_snapshot(moment) -> dict:
+    ids = list(
+        Sale.objects.active(moment)
+        .order_by("dateTo", "id")
+        .values_list("id", flat=True)
+    )
+    return {"ids": ids, "boundary": next_boundary(moment)}
+
+
+def get_active_sales(moment=None) -> dict:
+    """
+    Снимок действующих скидок: их id в порядке окончания и момент,
+    до которого снимок верен. Снимок живёт в кэше до этой границы, но не
+    дольше lookup_timeout, а изменения скидок сбрасывают его через
+    поколение пространства имён.
+    """
+    moment = moment or timezone.now()
+    key = make_key(SALES_CACHE_NAMESPACE, "active")
+    snapshot = cache.get(key)
+    if snapshot is not None and (
+        snapshot["boundary"] is None or moment < snapshot["boundary"]
+    ):
+        return snapshot
+
+    with primary_reads():
+        snapshot = build_snapshot(moment)
+    timeout = lookup_timeout()
+    if snapshot["boundary"] is not None:
+        remaining = math.ceil((snapshot["boundary"] - moment).total_seconds())
+        timeout = max(min(remaining, timeout), 1)
+    cache.set(key, snapshot, timeout)
+    return snapshot
@@ -25,13 +25,7 @@ class CategorySerializer(serializers.ModelSerializer):
         return ImageCategorySerializer(obj.image).data
 
     def getter_subcategories(self, obj: Category) -> List[Dict]:
-        data = [
-            {
-                "id": obj.id,
-                "title": obj.title,
-                "image": ImageCategorySerializer(obj.image).data,
-            }
-            for obj in obj.subcategories.all()
-        ]
-
-        return data
+        children = getattr(obj, "tree_children", None)
+        if children is None:
+            children = obj.subcategories.select_related("image")
+        return CategorySerializer(children, many=True).data
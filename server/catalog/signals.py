@@ -0,0 +1,104 @@
+from django.dispatch import receiver
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from tags.models import Tag
+from order.models import Order
+from catalog.models import Banner, Category
+from catalog.banners import invalidate_banners
+from product.models import Product, ProductImage, Review, Sale
+from catalog.cache import COUNT_CACHE_NAMESPACE, FACET_CACHE_NAMESPACE
+from catalog.cache import CATEGORY_CACHE_NAMESPACE, SALES_CACHE_NAMESPACE
+from catalog.cache import invalidate_tag_ids
+from catalog.cache import RESPONSE_CACHE_NAMESPACE, bump_generation, record_event
+
+
+def invalidate_responses():
+    bump_generation(RESPONSE_CACHE_NAMESPACE)
+    record_event(RESPONSE_CACHE_NAMESPACE, "invalidations")
+    invalidate_banners()
+
+
+def invalidate_listing_caches():
+    bump_generation(COUNT_CACHE_NAMESPACE)
+    bump_generation(FACET_CACHE_NAMESPACE)
+    invalidate_responses()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_on_product_changed(sender, **kwargs):
+    invalidate_listing_caches()
+
+
+@receiver(m2m_changed, sender=Product.tags.through)
+def invalidate_on_product_tags_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_listing_caches()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_on_tag_changed(sender, **kwargs):
+    invalidate_tag_ids()
+    bump_generation(FACET_CACHE_NAMESPACE)
+    invalidate_responses()
+
+
+@receiver(m2m_changed, sender=Product.images.through)
+@receiver(m2m_changed, sender=Product.reviews.through)
+@receiver(m2m_changed, sender=Order.products.through)
+def invalidate_on_product_relations_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_responses()
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+def invalidate_on_sale_changed(sender, **kwargs):
+    bump_generation(SALES_CACHE_NAMESPACE)
+    invalidate_listing_caches()
+
+
+@receiver(post_save, sender=Banner)
+@receiver(post_delete, sender=Banner)
+def invalidate_on_banner_changed(sender, **kwargs):
+    invalidate_banners()
+
+
+@receiver(post_save, sender=Category)
+def fill_path_on_raw_save(sender, instance, raw, **kwargs):
+    """
+    loaddata сохраняет категории без Category.save(): путь и глубина
+    заполняются здесь, если их нет в фикстуре.
+    """
+    if not raw or instance.path:
+        return
+    try:
+        parent_path = instance.get_parent_path()
+    except Category.DoesNotExist:
+        # Родитель ещё не загружен: без пути категория отдаётся без потомков.
+        return
+    path = parent_path + Category.path_segment(instance.pk)
+    depth = len(path) // Category.PATH_SEGMENT_LENGTH - 1
+    Category.objects.filter(pk=instance.pk).update(path=path, depth=depth)
+    instance.path, instance.depth = path, depth
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_on_category_changed(sender, **kwargs):
+    """
+    Перенос категории меняет состав поддерева, а с ним количество
+    и фасеты выдачи по категории.
+    """
+    bump_generation(CATEGORY_CACHE_NAMESPACE)
+    invalidate_listing_caches()
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=Order)
+def invalidate_on_related_changed(sender, **kwargs):
+    invalidate_responses()
@@ -1,14 +1,31 @@
+import csv
+import json
+from io import StringIO
+from datetime import timedelta
+
 from django.urls import reverse
-from django.test import TestCase
+from unittest import mock
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.core import serializers
+from django.core.cache import cache
 from rest_framework import status
-from django.db.models import Count
-from rest_framework.test import APIClient
+from asgiref.sync import async_to_sync
+from rest_framework.test import APIClient, APIRequestFactory
+from django.core.management import call_command
 from django.core.files.base import ContentFile
 from django.contrib.auth.models import User
 
 from tags.models import Tag
+from catalog.sales import get_active_sales
+from catalog.cache import RESPONSE_CACHE_NAMESPACE, get_stats, record_event
+from catalog.cache import FACET_CACHE_NAMESPACE, get_generation, get_subtree_ids
+from order.models import Order
 from catalog.serializers import CategorySerializer
-from catalog.models import Category, CategoryImage
+from catalog.models import Banner, Category, CategoryImage
+from catalog.views import AsyncCatalogListAPIView, AsyncCategoriesApiView
+from catalog.views import CatalogListAPIView, CategoriesApiView
+from tags.views import AsyncTagsDetailsAPIView, TagsDetailsAPIView
 from product.serializers import ProductShortSerializers
 from product.models import Product, ProductImage, Review, Sale
 
@@ -54,6 +71,94 @@ class TestCategoriesApiView(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, [])
 
+    def test_categories_single_query(self):
+        """
+        Проверка, что дерево категорий собирается одним запросом.
+        """
+        Category.objects.create(
+            title="Category 4", image=self.category_image, parent=self.category_2
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/categories/")
+        self.assertEqual(len(response.data), 4)
+
+    def test_root_categories(self):
+        """
+        Проверка вывода корневых категорий с вложенностью любой глубины.
+        """
+        category_4 = Category.objects.create(
+            title="Category 4", image=self.category_image, parent=self.category_2
+        )
+        response = self.client.get("/api/categories/", {"root": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in response.data], [self.category_1.id])
+
+        subcategories = response.data[0]["subcategories"]
+        self.assertEqual(
+            [item["id"] for item in subcategories],
+            [self.category_2.id, self.category_3.id],
+        )
+        self.assertEqual(subcategories[0]["subcategories"][0]["id"], category_4.id)
+
+    def test_category_subtree(self):
+        """
+        Проверка получения поддерева категории.
+        """
+        category_4 = Category.objects.create(title="Category 4", parent=self.category_2)
+        response = self.client.get(reverse("category-tree", args=[self.category_2.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.category_2.id)
+        self.assertEqual(response.data["subcategories"][0]["id"], category_4.id)
+
+        response = self.client.get(reverse("category-tree", args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_category_path_follows_parent(self):
+        """
+        Проверка пересчёта пути и глубины при переносе категории.
+        """
+        category_4 = Category.objects.create(title="Category 4", parent=self.category_2)
+        self.assertEqual(category_4.depth, 2)
+
+        self.category_2.parent = self.category_3
+        self.category_2.save()
+        category_4.refresh_from_db()
+
+        self.assertEqual(category_4.depth, 3)
+        self.assertTrue(category_4.path.startswith(self.category_3.path))
+        self.assertEqual(
+            set(Category.objects.subtree(self.category_3)),
+            {self.category_3, self.category_2, category_4},
+        )
+
+        self.category_3.parent = category_4
+        with self.assertRaises(ValueError):
+            self.category_3.save()
+
+    def test_category_without_path(self):
+        """
+        Проверка категорий, сохранённых без Category.save().
+        """
+        (bulk,) = Category.objects.bulk_create([Category(title="Bulk")])
+        self.assertEqual(list(Category.objects.subtree(bulk)), [bulk])
+        self.assertEqual(get_subtree_ids(bulk.id), [bulk.id])
+
+        fixture = json.dumps(
+            [
+                {
+                    "model": "catalog.category",
+                    "pk": 999,
+                    "fields": {"title": "Loaded", "parent": self.category_2.id},
+                }
+            ]
+        )
+        for obj in serializers.deserialize("json", fixture):
+            obj.save()
+        loaded = Category.objects.get(pk=999)
+        self.assertEqual(loaded.path, self.category_2.path + "0000000999/")
+        self.assertEqual(loaded.depth, 2)
+        self.assertIn(loaded, Category.objects.subtree(self.category_1))
+
 
 class TestCatalogListAPIView(TestCase):
     """
@@ -140,6 +245,50 @@ class TestCatalogListAPIView(TestCase):
         self.assertEqual(len(response.data["items"]), 1)
         self.assertEqual(response.data["items"][0]["title"], "Product 1")
 
+    def test_search_by_tag_and_category(self):
+        """
+        Тестирование поиска по названиям тегов и категории.
+        """
+        url = reverse("catalog")
+        response = self.client.get(url, {"name": "laptop"})
+        titles = {item["title"] for item in response.data["items"]}
+        self.assertEqual(titles, {"Product 2", "Product 3"})
+
+        response = self.client.get(url, {"name": "electronics"})
+        self.assertEqual(len(response.data["items"]), 3)
+
+    def test_search_by_prefix(self):
+        """
+        Тестирование поиска по началу слова.
+        """
+        url = reverse("catalog")
+        response = self.client.get(url, {"name": "smart"})
+        titles = {item["title"] for item in response.data["items"]}
+        self.assertEqual(titles, {"Product 1", "Product 3"})
+
+    def test_search_sort_by_relevance(self):
+        """
+        Тестирование сортировки результатов поиска по релевантности.
+        """
+        self.product2.description = "laptop laptop laptop"
+        self.product2.save()
+        url = reverse("catalog")
+        response = self.client.get(url, {"name": "laptop", "sort": "relevance"})
+        titles = [item["title"] for item in response.data["items"]]
+        self.assertEqual(titles, ["Product 2", "Product 3"])
+
+    def test_search_index_follows_tag_rename(self):
+        """
+        Тестирование переиндексации товаров после переименования тега.
+        """
+        self.tag2.name = "notebook"
+        self.tag2.save()
+        url = reverse("catalog")
+        response = self.client.get(url, {"name": "notebook"})
+        self.assertEqual(len(response.data["items"]), 2)
+        response = self.client.get(url, {"name": "laptop"})
+        self.assertEqual(len(response.data["items"]), 0)
+
     def test_filter_by_min_price(self):
         """
         Тестирование фильтра минимальной цены.
@@ -213,6 +362,31 @@ class TestCatalogListAPIView(TestCase):
         prices = [item["price"] for item in response.data["items"]]
         self.assertEqual(prices, sorted(prices))
 
+    def test_sort_by_title_with_id_tiebreaker(self):
+        """
+        Тестирование сортировки по названию и порядка равных значений по id.
+        """
+        Product.objects.update(title="Same")
+        url = reverse("catalog")
+        response = self.client.get(url, {"sort": "title", "sortType": "dec"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [item["id"] for item in response.data["items"]]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_unknown_sort_rejected(self):
+        """
+        Тестирование отказа в сортировке по полям вне реестра.
+        """
+        url = reverse("catalog")
+        for params in (
+            {"sort": "description"},
+            {"sort": "price", "sortType": "random"},
+            {"ordering": "description", "sort": "category__title"},
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_filter_by_tags(self):
         """
         Тестирование фильтрации по тегам.
@@ -224,6 +398,105 @@ class TestCatalogListAPIView(TestCase):
         for item in response.data["items"]:
             self.assertIn("laptop", [tag["name"] for tag in item["tags"]])
 
+    def test_filter_by_tags_any_and_all(self):
+        """
+        Тестирование режимов or/and без дублирования товаров.
+        """
+        url = reverse("catalog")
+        params = {"tags[]": [self.tag1.id, self.tag2.id], "sort": "price"}
+        response = self.client.get(url, params)
+        ids = [item["id"] for item in response.data["items"]]
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(len(set(ids)), 3)
+
+        response = self.client.get(url, {**params, "tagsMode": "and"})
+        ids = [item["id"] for item in response.data["items"]]
+        self.assertEqual(ids, [self.product3.id])
+
+    def test_filter_by_numeric_tag_name(self):
+        """
+        Тестирование тега с именем из цифр: имя важнее совпадения с id.
+        """
+        tag = Tag.objects.create(name=str(self.tag2.id))
+        self.product1.tags.add(tag)
+
+        url = reverse("catalog")
+        response = self.client.get(url, {"tags": [tag.name]})
+        ids = [item["id"] for item in response.data["items"]]
+        self.assertEqual(ids, [self.product1.id])
+
+        response = self.client.get(url, {"tags[]": [tag.id]})
+        ids = [item["id"] for item in response.data["items"]]
+        self.assertEqual(ids, [self.product1.id])
+
+    def test_filter_by_category_subtree(self):
+        """
+        Тестирование фильтра по категории вместе с подкатегориями.
+        """
+        child = Category.objects.create(title="Phones", parent=self.category)
+        grandchild = Category.objects.create(title="Smartphones", parent=child)
+        other = Category.objects.create(title="Books")
+        self.product2.category = grandchild
+        self.product2.save()
+        self.product3.category = other
+        self.product3.save()
+
+        url = reverse("catalog")
+        response = self.client.get(url, {"category": self.category.id})
+        titles = {item["title"] for item in response.data["items"]}
+        self.assertEqual(titles, {"Product 1", "Product 2"})
+
+        response = self.client.get(url, {"category": child.id})
+        titles = {item["title"] for item in response.data["items"]}
+        self.assertEqual(titles, {"Product 2"})
+
+        grandchild.parent = other
+        grandchild.save()
+        response = self.client.get(url, {"category": other.id})
+        titles = {item["title"] for item in response.data["items"]}
+        self.assertEqual(titles, {"Product 2", "Product 3"})
+
+        response = self.client.get(url, {"category": 999})
+        self.assertEqual(response.data["items"], [])
+
+    def test_category_move_invalidates_counts_and_facets(self):
+        """
+        Перенос категории меняет состав поддерева: кэшированные количество
+        и фасеты выдачи по категории сбрасываются.
+        """
+        child = Category.objects.create(title="Phones", parent=self.category)
+        other = Category.objects.create(title="Books")
+        self.product2.category = child
+        self.product2.save()
+        self.product3.category = other
+        self.product3.save()
+
+        url = reverse("catalog")
+        params = {"category": other.id, "limit": 1}
+        self.assertEqual(self.client.get(url, params).data["lastPage"], 1)
+        facets = get_generation(FACET_CACHE_NAMESPACE)
+
+        child.parent = other
+        child.save()
+        self.assertEqual(self.client.get(url, params).data["lastPage"], 2)
+        self.assertNotEqual(get_generation(FACET_CACHE_NAMESPACE), facets)
+
+    def test_filter_by_unknown_tag(self):
+        """
+        Тестирование фильтра по несуществующему тегу.
+        """
+        url = reverse("catalog")
+        response = self.client.get(url, {"tags": ["missing"]})
+        self.assertEqual(response.data["items"], [])
+
+        response = self.client.get(url, {"tags": ["missing", "LAPTOP"]})
+        self.assertEqual(len(response.data["items"]), 2)
+
+        response = self.client.get(
+            url, {"tags": ["missing", "laptop"], "tagsMode": "and"}
+        )
+        self.assertEqual(response.data["items"], [])
+
     def test_combined_filters(self):
         """
         Тестирование со всеми параметрами.
@@ -266,6 +539,329 @@ class TestCatalogListAPIView(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_count_is_cached(self):
+        """
+        Тестирование кэширования общего количества для набора фильтров.
+        """
+        url = reverse("catalog")
+        cache.clear()
+        response = self.client.get(url, {"limit": 1, "freeDelivery": True})
+        self.assertEqual(response.data["lastPage"], 2)
+
+        Product.objects.filter(id=self.product2.id).update(freeDelivery=True)
+        response = self.client.get(url, {"limit": 1, "freeDelivery": "true"})
+        self.assertEqual(response.data["lastPage"], 2)
+
+    def test_count_cache_invalidated_on_product_save(self):
+        """
+        Тестирование сброса кэша количества при изменении товара.
+        """
+        url = reverse("catalog")
+        cache.clear()
+        response = self.client.get(url, {"limit": 1, "freeDelivery": True})
+        self.assertEqual(response.data["lastPage"], 2)
+
+        self.product2.freeDelivery = True
+        self.product2.save()
+        response = self.client.get(url, {"limit": 1, "freeDelivery": True})
+        self.assertEqual(response.data["lastPage"], 3)
+
+    def test_cursor_pagination(self):
+        """
+        Тестирование keyset-пагинации с сортировкой по цене.
+        """
+        url = reverse("catalog")
+        response = self.client.get(
+            url, {"cursor": "", "limit": 2, "sort": "price", "sortType": "dec"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("lastPage", response.data)
+        titles = [item["title"] for item in response.data["items"]]
+        self.assertEqual(titles, ["Product 2", "Product 3"])
+        self.assertIsNotNone(response.data["nextCursor"])
+
+        response = self.client.get(
+            url,
+            {
+                "cursor": response.data["nextCursor"],
+                "limit": 2,
+                "sort": "price",
+                "sortType": "dec",
+            },
+        )
+        titles = [item["title"] for item in response.data["items"]]
+        self.assertEqual(titles, ["Product 1"])
+        self.assertIsNone(response.data["nextCursor"])
+
+    def test_price_filter_and_sort_use_active_sales(self):
+        """
+        Тестирование фильтра и сортировки по цене с учётом скидок.
+        """
+        Sale.objects.create(
+            product=self.product2,
+            salePrice=50,
+            dateFrom=timezone.now() - timedelta(days=1),
+            dateTo=timezone.now() + timedelta(days=1),
+            title="Sale",
+        )
+        url = reverse("catalog")
+        response = self.client.get(url, {"sort": "price", "sortType": "inc"})
+        ids = [item["id"] for item in response.data["items"]]
+        self.assertEqual(ids[0], self.product2.id)
+
+        response = self.client.get(url, {"maxPrice": 60})
+        ids = [item["id"] for item in response.data["items"]]
+        self.assertEqual(ids, [self.product2.id])
+
+    def test_cursor_pagination_ties(self):
+        """
+        Тестирование keyset-пагинации при одинаковых значениях ключа сортировки.
+        """
+        Product.objects.update(price=100, effective_price=100)
+        url = reverse("catalog")
+        params = {"cursor": "", "limit": 1, "sort": "price", "sortType": "inc"}
+        seen = []
+        while True:
+            response = self.client.get(url, params)
+            seen += [item["id"] for item in response.data["items"]]
+            if response.data["nextCursor"] is None:
+                break
+            params["cursor"] = response.data["nextCursor"]
+
+        self.assertEqual(seen, [self.product1.id, self.product2.id, self.product3.id])
+
+    def test_invalid_cursor(self):
+        """
+        Тестирование некорректного курсора и курсора от другой сортировки.
+        """
+        url = reverse("catalog")
+        response = self.client.get(url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            url, {"cursor": "", "limit": 1, "sort": "price", "sortType": "dec"}
+        )
+        response = self.client.get(
+            url,
+            {"cursor": response.data["nextCursor"], "sort": "date", "limit": 1},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestCatalogFacetsAPIView(TestCase):
+    """
+    Тестирование GET /api/catalog/facets/
+    """
+
+    def setUp(self):
+        self.url = reverse("catalog-facets")
+        self.category = Category.objects.create(title="Electronics")
+        self.tag1 = Tag.objects.create(name="smartphone")
+        self.tag2 = Tag.objects.create(name="laptop")
+
+        self.product1 = Product.objects.create(
+            title="Product 1", price=100, count=10, category=self.category
+        )
+        self.product2 = Product.objects.create(
+            title="Product 2",
+            price=200,
+            count=0,
+            category=self.category,
+            freeDelivery=True,
+        )
+        self.product3 = Product.objects.create(
+            title="Product 3",
+            price=150,
+            count=3,
+            category=self.category,
+            freeDelivery=True,
+        )
+        self.product1.tags.add(self.tag1)
+        self.product2.tags.add(self.tag2)
+        self.product3.tags.add(self.tag1, self.tag2)
+        cache.clear()
+
+    def test_facets(self):
+        """
+        Тестирование фасетов для всего каталога.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total"], 3)
+        self.assertEqual(response.data["freeDelivery"], 2)
+        self.assertEqual(response.data["available"], 2)
+        self.assertEqual(response.data["price"]["min"], "100.00")
+        self.assertEqual(response.data["price"]["max"], "200.00")
+
+        histogram = response.data["price"]["histogram"]
+        self.assertEqual(sum(bucket["count"] for bucket in histogram), 3)
+        self.assertEqual(histogram[0]["count"], 1)
+        self.assertEqual(histogram[-1]["count"], 1)
+
+        tags = {tag["name"]: tag["count"] for tag in response.data["tags"]}
+        self.assertEqual(tags, {"smartphone": 2, "laptop": 2})
+
+    def test_facets_with_filters(self):
+        """
+        Тестирование фасетов с фильтрами каталога.
+        """
+        response = self.client.get(self.url, {"tags": ["laptop"], "available": True})
+        self.assertEqual(response.data["total"], 1)
+        tags = {tag["name"]: tag["count"] for tag in response.data["tags"]}
+        self.assertEqual(tags, {"smartphone": 2, "laptop": 1})
+
+    def test_tag_facet_ignores_tag_filter(self):
+        """
+        Тестирование фасета тегов: выбранный тег не скрывает остальные
+        и не меняет их количество.
+        """
+        for mode in ("or", "and"):
+            with self.subTest(mode=mode):
+                response = self.client.get(
+                    self.url, {"tags": ["smartphone"], "tagsMode": mode}
+                )
+                self.assertEqual(response.data["total"], 2)
+                tags = {tag["name"]: tag["count"] for tag in response.data["tags"]}
+                self.assertEqual(tags, {"smartphone": 2, "laptop": 2})
+
+    def test_facets_empty(self):
+        """
+        Тестирование фасетов при отсутствии подходящих товаров.
+        """
+        response = self.client.get(self.url, {"minPrice": 1000})
+        self.assertEqual(response.data["total"], 0)
+        self.assertIsNone(response.data["price"]["min"])
+        self.assertEqual(response.data["price"]["histogram"], [])
+        self.assertEqual(response.data["tags"], [])
+
+    def test_facets_cached_and_invalidated(self):
+        """
+        Тестирование кэширования фасетов и сброса кэша при изменении товаров.
+        """
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.product1.freeDelivery = True
+        self.product1.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["freeDelivery"], 3)
+
+    def test_invalid_filter(self):
+        """
+        Тестирование некорректного значения фильтра.
+        """
+        response = self.client.get(self.url, {"minPrice": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestResponseCache(TestCase):
+    """
+    Тестирование кэша ответов списковых эндпоинтов.
+    """
+
+    def setUp(self):
+        self.category = Category.objects.create(title="Electronics")
+        self.product = Product.objects.create(
+            title="Product 1", price=100, count=5, category=self.category
+        )
+        cache.clear()
+
+    def test_second_request_served_from_cache(self):
+        """
+        Тестирование ответа из кэша без запросов к базе.
+        """
+        for url in (
+            reverse("catalog"),
+            reverse("product-popular"),
+            reverse("product-limited"),
+            reverse("sales"),
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response["X-Cache"], "MISS")
+            with self.assertNumQueries(0):
+                cached = self.client.get(url)
+            self.assertEqual(cached["X-Cache"], "HIT")
+            self.assertEqual(cached.json(), response.json())
+
+    def test_query_string_is_canonicalized(self):
+        """
+        Тестирование одинакового ключа при разном порядке параметров.
+        """
+        self.client.get(reverse("catalog") + "?limit=5&currentPage=1")
+        response = self.client.get(reverse("catalog") + "?currentPage=1&limit=5")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_invalidated_on_writes(self):
+        """
+        Тестирование сброса кэша при изменении товаров, тегов и скидок.
+        """
+        url = reverse("catalog")
+        self.client.get(url)
+
+        self.product.title = "Renamed"
+        self.product.save()
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["items"][0]["title"], "Renamed")
+
+        self.product.tags.add(Tag.objects.create(name="new"))
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+
+        Sale.objects.create(
+            product=self.product,
+            salePrice=50,
+            dateFrom="2024-12-01T00:00:00Z",
+            dateTo="2024-12-31T23:59:59Z",
+            title="Sale",
+        )
+        self.assertEqual(self.client.get(reverse("sales"))["X-Cache"], "MISS")
+
+    def test_conditional_get(self):
+        """
+        Тестирование ответа 304 по ETag и новой версии после изменения.
+        """
+        url = reverse("catalog")
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    @override_settings(CATALOG_CACHE_STATS_SAMPLE_RATE=1)
+    def test_stats_command(self):
+        """
+        Тестирование вывода статистики кэша.
+        """
+        url = reverse("product-popular")
+        self.client.get(url)
+        self.client.get(url)
+        out = StringIO()
+        call_command("catalog_cache_stats", stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[:2], ["hits: 1", "misses: 1"])
+        self.assertTrue(lines[2].startswith("invalidations: "))
+        self.assertEqual(lines[3], "hit ratio: 50.00%")
+
+    @override_settings(CATALOG_CACHE_STATS_SAMPLE_RATE=0.25)
+    def test_stats_are_sampled(self):
+        """
+        Тестирование выборочной записи попаданий с весом 1/доля.
+        """
+        with mock.patch("catalog.cache.random.random", return_value=0.9):
+            record_event(RESPONSE_CACHE_NAMESPACE, "hits", sampled=True)
+        self.assertEqual(get_stats(RESPONSE_CACHE_NAMESPACE)["hits"], 0)
+
+        with mock.patch("catalog.cache.random.random", return_value=0.1):
+            record_event(RESPONSE_CACHE_NAMESPACE, "hits", sampled=True)
+        self.assertEqual(get_stats(RESPONSE_CACHE_NAMESPACE)["hits"], 4)
+
 
 class ProductPopularAPIViewTest(TestCase):
     """
@@ -333,24 +929,24 @@ class ProductPopularAPIViewTest(TestCase):
         self.user = User.objects.create_user(username="testuser", password="password")
 
         for i in range(5):
-            Review.objects.create(
+            review = Review.objects.create(
                 author=self.user,
                 email=f"user{i}@example.com",
                 text=f"Review {i} for product 1",
                 rate=4,
                 date="2024-12-19T12:00:00Z",
-                product=self.product1,
             )
+            self.product1.reviews.add(review)
 
         for i in range(3):
-            Review.objects.create(
+            review = Review.objects.create(
                 author=self.user,
                 email=f"user_review{i}@example.com",
                 text="Excellent product",
                 rate=5,
                 date="2024-12-19T12:00:00Z",
-                product=self.product2,
             )
+            self.product2.reviews.add(review)
 
     def test_get_popular_product(self):
         """
@@ -359,14 +955,56 @@ class ProductPopularAPIViewTest(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        popular_product = (
-            Product.objects.annotate(reviews_count=Count("reviews"))
-            .order_by("-reviews_count")
-            .first()
-        )
-        serialized_data = ProductShortSerializers(popular_product).data
+        self.product1.refresh_from_db()
+        serialized_data = ProductShortSerializers(self.product1).data
 
         self.assertEqual(response.data, serialized_data)
+        self.assertEqual(response.data["reviews"], 5)
+        self.assertEqual(response.data["rating"], 4.0)
+
+    def test_get_top_popular_products(self):
+        """
+        Тестирование получения первых товаров рейтинга популярности.
+        """
+        response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in response.data],
+            [self.product1.id, self.product2.id],
+        )
+
+    def test_orders_raise_popularity(self):
+        """
+        Тестирование влияния заказов на рейтинг популярности.
+        """
+        for i in range(5):
+            order = Order.objects.create(
+                fullName="John Doe",
+                email="john@example.com",
+                phone="123456789",
+                deliveryType="courier",
+                paymentType="cash",
+                status="accepted",
+                city="Moscow",
+                address="Red Square 1",
+            )
+            order.products.add(self.product3)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["id"], self.product3.id)
+
+        Product.objects.update(orders_count=0, popularity=0)
+        call_command("rebuild_popularity", stdout=StringIO())
+        response = self.client.get(self.url, {"limit": 3})
+        self.assertEqual(response.data[0]["id"], self.product3.id)
+
+    def test_invalid_limit(self):
+        """
+        Тестирование некорректного параметра limit.
+        """
+        for limit in ("0", "abc", "1000"):
+            response = self.client.get(self.url, {"limit": limit})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
 class ProductLimitedAPIViewTest(TestCase):
@@ -436,7 +1074,7 @@ class ProductLimitedAPIViewTest(TestCase):
         """
         response = self.client.get(self.url)
 
-        data = response.json()
+        data = response.json()["items"]
         self.assertEqual(len(data), 1)
 
         product_titles = [product["title"] for product in data]
@@ -453,7 +1091,7 @@ class ProductLimitedAPIViewTest(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        data = response.json()
+        data = response.json()["items"]
         product_titles = [product["title"] for product in data]
         self.assertNotIn("Product 2", product_titles)
 
@@ -467,9 +1105,49 @@ class ProductLimitedAPIViewTest(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        data = response.json()
+        data = response.json()["items"]
         self.assertEqual(len(data), 0)
 
+    def test_most_urgent_first_and_paginated(self):
+        """
+        Проверка порядка по возрастанию остатка и постраничного вывода.
+        """
+        self.product1.count = 2
+        self.product1.save()
+
+        response = self.client.get(self.url, {"limit": 1})
+        data = response.json()
+        self.assertEqual(data["items"][0]["title"], "Product 1")
+        self.assertEqual(data["currentPage"], 1)
+        self.assertEqual(data["lastPage"], 2)
+
+        response = self.client.get(self.url, {"limit": 1, "currentPage": 2})
+        self.assertEqual(response.json()["items"][0]["title"], "Product 3")
+
+    def test_threshold_setting(self):
+        """
+        Проверка настраиваемого порога остатка.
+        """
+        with self.settings(PRODUCT_LIMITED_THRESHOLD=200):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()["items"]), 2)
+
+    @override_settings(CATALOG_ESTIMATED_COUNT=True)
+    def test_estimated_count_ignores_filtered_view(self):
+        """
+        Оценка по статистике таблицы не подменяет количество, когда
+        представление само фильтрует товары по остатку.
+        """
+        with mock.patch(
+            "catalog.pagination.estimate_table_rows", return_value=1000
+        ) as estimate:
+            limited = self.client.get(self.url, {"limit": 1}).json()
+            catalog = self.client.get(reverse("catalog"), {"limit": 1}).json()
+
+        self.assertEqual(limited["lastPage"], 1)
+        self.assertEqual(catalog["lastPage"], 1000)
+        estimate.assert_called_once()
+
 
 class TestSalesListAPIView(TestCase):
     """
@@ -512,19 +1190,27 @@ class TestSalesListAPIView(TestCase):
         )
         self.product.images.add(self.image1, self.image2)
 
+        now = timezone.now()
         self.sale1 = Sale.objects.create(
             product=self.product,
             salePrice=80.00,
-            dateFrom="2024-12-01T00:00:00Z",
-            dateTo="2024-12-31T23:59:59Z",
+            dateFrom=now - timedelta(days=10),
+            dateTo=now + timedelta(days=20),
             title="Holiday Sale",
         )
         self.sale2 = Sale.objects.create(
             product=self.product,
             salePrice=75.00,
+            dateFrom=now - timedelta(days=1),
+            dateTo=now + timedelta(days=5),
+            title="Black Friday",
+        )
+        self.expired = Sale.objects.create(
+            product=self.product,
+            salePrice=70.00,
             dateFrom="2024-11-01T00:00:00Z",
             dateTo="2024-11-30T23:59:59Z",
-            title="Black Friday",
+            title="Expired",
         )
 
     def tearDown(self):
@@ -575,6 +1261,35 @@ class TestSalesListAPIView(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["items"]), 0)
 
+    def test_only_active_sales_ending_first(self):
+        """
+        Тестирование вывода только действующих скидок по дате окончания.
+        """
+        response = self.client.get(self.url)
+        titles = [item["title"] for item in response.data["items"]]
+        self.assertEqual(titles, ["Black Friday", "Holiday Sale"])
+        self.assertEqual(
+            response.data["items"][0]["images"],
+            [self.image1.src.url, self.image2.src.url],
+        )
+
+    def test_snapshot_rolls_over_at_boundary(self):
+        """
+        Тестирование обновления снимка скидок на ближайшей границе.
+        """
+        cache.clear()
+        now = timezone.now()
+        snapshot = get_active_sales(now)
+        self.assertEqual(snapshot["ids"], [self.sale2.id, self.sale1.id])
+        self.assertEqual(snapshot["boundary"], self.sale2.dateTo)
+
+        with self.assertNumQueries(0):
+            get_active_sales(now + timedelta(days=1))
+
+        later = get_active_sales(now + timedelta(days=6))
+        self.assertEqual(later["ids"], [self.sale1.id])
+        self.assertEqual(later["boundary"], self.sale1.dateTo)
+
 
 class TestBannersListAPIView(TestCase):
     """
@@ -638,8 +1353,8 @@ class TestBannersListAPIView(TestCase):
         """
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
-        product_data = response.data[0]
+        self.assertEqual(len(response.json()), 2)
+        product_data = response.json()[0]
         self.assertIn("id", product_data)
         self.assertIn("category", product_data)
         self.assertIn("price", product_data)
@@ -659,4 +1374,311 @@ class TestBannersListAPIView(TestCase):
         Product.objects.all().delete()
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.json(), [])
+
+    def test_curated_banners(self):
+        """
+        Тестируем вывод баннеров из админки в порядке позиций.
+        """
+        Banner.objects.create(product=self.product2, position=1)
+        Banner.objects.create(product=self.product1, position=2)
+        Banner.objects.create(product=self.product1, position=0, is_active=False)
+
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [item["id"] for item in response.json()],
+            [self.product2.id, self.product1.id],
+        )
+
+    def test_served_from_cache_and_rebuilt(self):
+        """
+        Тестируем ответ из кэша и пересборку при изменении товара баннера.
+        """
+        Banner.objects.create(product=self.product1, position=0)
+        response = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.content, response.content)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                self.url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.product1.title = "Renamed"
+        self.product1.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()[0]["title"], "Renamed")
+
+
+class TestListQueryCounts(TestCase):
+    """
+    Проверка, что количество запросов списковых эндпоинтов
+    не зависит от количества товаров на странице.
+    """
+
+    def setUp(self):
+        self.category = Category.objects.create(title="Electronics")
+        self.images = []
+
+    def tearDown(self):
+        for image in self.images:
+            image.src.delete(save=False)
+
+    def create_products(self, amount):
+        for i in range(amount):
+            image = ProductImage.objects.create(
+                src=ContentFile(b"fake_image_content", f"product_{i}.jpg"),
+                alt=f"Image {i}",
+            )
+            self.images.append(image)
+            product = Product.objects.create(
+                title=f"Product {i}",
+                price=100 + i,
+                count=i % 10,
+                category=self.category,
+            )
+            product.images.add(image)
+            product.tags.add(Tag.objects.create(name=f"tag {product.id}"))
+            Sale.objects.create(
+                product=product,
+                salePrice=50,
+                dateFrom=timezone.now() - timedelta(days=1),
+                dateTo=timezone.now() + timedelta(days=1),
+                title=f"Sale {i}",
+            )
+
+    def assert_constant_queries(self, url, expected, params=None):
+        for amount in (1, 5):
+            self.create_products(amount)
+            cache.clear()
+            with self.assertNumQueries(expected):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_catalog_queries(self):
+        self.assert_constant_queries(reverse("catalog"), 4)
+
+    def test_catalog_cursor_queries(self):
+        self.assert_constant_queries(reverse("catalog"), 3, {"cursor": ""})
+
+    def test_banners_queries(self):
+        self.assert_constant_queries(reverse("banners"), 4)
+
+    def test_popular_queries(self):
+        self.assert_constant_queries(reverse("product-popular"), 3)
+
+    def test_limited_queries(self):
+        self.assert_constant_queries(reverse("product-limited"), 4)
+
+    def test_sales_queries(self):
+        self.assert_constant_queries(reverse("sales"), 4)
+
+    def test_categories_queries(self):
+        self.assert_constant_queries(reverse("categories"), 1)
+
+
+class TestAsyncViews(TestCase):
+    """
+    Асинхронные варианты представлений отвечают так же, как синхронные.
+    """
+
+    def setUp(self):
+        root = Category.objects.create(title="Electronics")
+        child = Category.objects.create(title="Phones", parent=root)
+        tag = Tag.objects.create(name="Gaming")
+        for i in range(5):
+            product = Product.objects.create(
+                title=f"Product {i}",
+                price=100 + i,
+                count=i,
+                category=child if i % 2 else root,
+            )
+            product.tags.add(tag)
+            product.images.add(
+                ProductImage.objects.create(src=f"product_{i}.jpg", alt=f"Image {i}")
+            )
+
+    def get(self, view, params=None, asynchronous=False):
+        cache.clear()
+        request = APIRequestFactory().get("/api/", params)
+        if asynchronous:
+            response = async_to_sync(view.as_view())(request)
+        else:
+            response = view.as_view()(request)
+        response.render()
+        return response
+
+    def assert_same_response(self, sync_view, async_view, params=None):
+        expected = self.get(sync_view, params)
+        response = self.get(async_view, params, asynchronous=True)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+        return response
+
+    def test_catalog(self):
+        for params in (
+            None,
+            {"limit": 2, "currentPage": 2, "sort": "price", "sortType": "inc"},
+            {"category": Category.objects.get(title="Electronics").id},
+            {"cursor": "", "limit": 2, "sort": "date"},
+            {"tags[]": ["Gaming"], "freeDelivery": "false"},
+        ):
+            with self.subTest(params=params):
+                self.assert_same_response(
+                    CatalogListAPIView, AsyncCatalogListAPIView, params
+                )
+
+    def test_catalog_errors(self):
+        response = self.assert_same_response(
+            CatalogListAPIView, AsyncCatalogListAPIView, {"currentPage": 9}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.assert_same_response(
+            CatalogListAPIView, AsyncCatalogListAPIView, {"sort": "unknown"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_catalog_cache(self):
+        cache.clear()
+        view = async_to_sync(AsyncCatalogListAPIView.as_view())
+        first = view(APIRequestFactory().get("/api/"))
+        second = view(APIRequestFactory().get("/api/"))
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        not_modified = view(
+            APIRequestFactory().get("/api/", HTTP_IF_NONE_MATCH=first["ETag"])
+        )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_categories(self):
+        for params in (None, {"root": "true"}):
+            with self.subTest(params=params):
+                self.assert_same_response(
+                    CategoriesApiView, AsyncCategoriesApiView, params
+                )
+
+    def test_tags(self):
+        Tag.objects.create(name="Books")
+        response = self.assert_same_response(
+            TagsDetailsAPIView, AsyncTagsDetailsAPIView
+        )
+        self.assertEqual(
+            [tag["name"] for tag in json.loads(response.content)], ["Gaming", "Books"]
+        )
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "test_catalog_cache",
+        }
+    }
+)
+class TestAsyncViewsDatabaseCache(TransactionTestCase):
+    """
+    Асинхронный каталог с бэкендом кэша, который ходит в базу: синхронные
+    обращения к кэшу из цикла событий запрещены Django.
+    """
+
+    def setUp(self):
+        call_command("createcachetable", verbosity=0)
+        category = Category.objects.create(title="Electronics")
+        for i in range(3):
+            Product.objects.create(
+                title=f"Product {i}", price=100 + i, count=i, category=category
+            )
+
+    def test_catalog(self):
+        view = async_to_sync(AsyncCatalogListAPIView.as_view())
+        for params in (None, {"limit": 2, "currentPage": 2}, {"cursor": ""}):
+            with self.subTest(params=params):
+                response = view(APIRequestFactory().get("/api/", params))
+                response.render()
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response["X-Cache"], "MISS")
+
+        response = view(APIRequestFactory().get("/api/"))
+        self.assertEqual(response["X-Cache"], "HIT")
+
+
+class TestCatalogExportAPIView(TestCase):
+    """
+    Тестирование GET /api/catalog/export/
+    """
+
+    def setUp(self):
+        self.url = reverse("catalog-export")
+        self.category = Category.objects.create(title="Electronics")
+        self.tag = Tag.objects.create(name="gaming")
+        self.products = []
+        for i in range(3):
+            product = Product.objects.create(
+                title=f"Product {i}", price=100 + i, count=i, category=self.category
+            )
+            product.tags.add(self.tag)
+            self.products.append(product)
+        Sale.objects.create(
+            product=self.products[0],
+            salePrice=50,
+            dateFrom=timezone.now() - timedelta(days=1),
+            dateTo=timezone.now() + timedelta(days=1),
+            title="Sale",
+        )
+        self.admin = User.objects.create_user(
+            username="admin", password="password", is_staff=True
+        )
+
+    def read(self, response) -> str:
+        return b"".join(response.streaming_content).decode()
+
+    def test_requires_admin(self):
+        """
+        Тестирование запрета выгрузки без прав администратора.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        User.objects.create_user(username="user", password="password")
+        self.client.login(username="user", password="password")
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_export_ndjson(self):
+        """
+        Тестирование выгрузки NDJSON с тегами и действующей скидкой.
+        """
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row["id"] for row in rows], [p.id for p in self.products])
+        self.assertEqual(rows[0]["tags"], ["gaming"])
+        self.assertEqual(rows[0]["sale"]["salePrice"], "50.00")
+        self.assertEqual(rows[0]["effective_price"], "50.00")
+        self.assertIsNone(rows[1]["sale"])
+
+    def test_export_csv(self):
+        """
+        Тестирование выгрузки CSV с постоянным числом запросов на пачку.
+        """
+        self.client.force_login(self.admin)
+        with self.settings(CATALOG_EXPORT_CHUNK_SIZE=10):
+            response = self.client.get(self.url, {"output": "csv"})
+            with self.assertNumQueries(4):
+                content = self.read(response)
+
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(rows[0][:3], ["id", "title", "category"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][-3], "50.00")
+
+    def test_unknown_output(self):
+        """
+        Тестирование неизвестного формата выгрузки.
+        """
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {"output": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,16 +1,30 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
+    AsyncCatalogListAPIView,
+    AsyncCategoriesApiView,
     CategoriesApiView,
+    CategoryTreeApiView,
     CatalogListAPIView,
+    CatalogFacetsAPIView,
+    CatalogExportAPIView,
     ProductPopularAPIView,
     ProductLimitedAPIView,
     SalesListAPIView,
     BannersListAPIView,
 )
 
+if settings.ASYNC_API_VIEWS:
+    categories_view, catalog_view = AsyncCategoriesApiView, AsyncCatalogListAPIView
+else:
+    categories_view, catalog_view = CategoriesApiView, CatalogListAPIView
+
 urlpatterns = [
-    path("categories/", CategoriesApiView.as_view(), name="categories"),
-    path("catalog/", CatalogListAPIView.as_view(), name="catalog"),
+    path("categories/", categories_view.as_view(), name="categories"),
+    path("categories/<int:id>/", CategoryTreeApiView.as_view(), name="category-tree"),
+    path("catalog/", catalog_view.as_view(), name="catalog"),
+    path("catalog/facets/", CatalogFacetsAPIView.as_view(), name="catalog-facets"),
+    path("catalog/export/", CatalogExportAPIView.as_view(), name="catalog-export"),
     path("products/popular/", ProductPopularAPIView.as_view(), name="product-popular"),
     path("products/limited/", ProductLimitedAPIView.as_view(), name="product-limited"),
     path("sales/", SalesListAPIView.as_view(), name="sales"),
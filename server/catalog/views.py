@@ -1,85 +1,362 @@
-from django.db.models import Count, Avg
-from rest_framework.filters import OrderingFilter
+import math
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.core.cache import cache
+from django.utils.http import quote_etag
+from django.utils.cache import get_conditional_response
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.generics import ListAPIView, RetrieveAPIView, get_object_or_404
 
 from catalog.models import Category
+from server.async_views import AsyncAPIView
+from server.db_routing import primary_reads, stream_from_replica
 from product.models import Product, Sale
 from catalog.filters import CatalogFilter
+from catalog.facets import compute_facets
+from catalog.sales import get_active_sales
+from catalog.banners import get_banners
+from catalog.export import export_csv, export_ndjson
+from catalog.cache import FACET_CACHE_NAMESPACE, RESPONSE_CACHE_NAMESPACE
+from catalog.cache import canonical_query, make_key, normalize_params, record_event
 from catalog.serializers import CategorySerializer
 from catalog.pagination import CustomPagination, SalePagination
-from product.serializers import ProductShortSerializers, SaleSerializers
+from product.popularity import top_products
+from product.serializers import ProductCardSerializer, ProductShortSerializers
+from product.serializers import SaleSerializers
+
+
+class EagerLoadingViewMixin:
+    """
+    Применяет к queryset связи, объявленные сериализатором.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return self.get_serializer_class().setup_eager_loading(queryset)
+
+
+class CachedResponseMixin:
+    """
+    Кэширует данные ответа GET-запроса по пути и каноническим параметрам.
+    Ответы не зависят от пользователя; кэш сбрасывается сигналами
+    через счётчик поколений (см. catalog.signals).
+
+    ETag строится из поколения и хэша запроса, поэтому If-None-Match
+    проверяется до обращения к кэшу и базе. Ответ на промах читается
+    из основной базы: данные реплики могут отставать от сброса кэша.
+    """
+
+    def get_cache_key_parts(self, request) -> list:
+        return [request.path, canonical_query(request.query_params)]
+
+    def get_cache_timeout(self) -> Optional[int]:
+        return getattr(settings, "CATALOG_RESPONSE_CACHE_TIMEOUT", 300)
+
+    def get(self, request, *args, **kwargs):
+        key, etag = self.get_cache_key_and_etag(request)
+        not_modified = self.get_not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        data = cache.get(key, self)
+        if data is not self:
+            record_event(RESPONSE_CACHE_NAMESPACE, "hits", sampled=True)
+            return Response(data, headers={"X-Cache": "HIT", "ETag": etag})
+
+        record_event(RESPONSE_CACHE_NAMESPACE, "misses", sampled=True)
+        with primary_reads():
+            response = super().get(request, *args, **kwargs)
+        return self.store_response(key, etag, response)
+
+    async def aget(self, request, *args, **kwargs):
+        """
+        Асинхронный вариант ``get``: ответ на промах строит ``alist``.
+        """
+        key, etag = await sync_to_async(self.get_cache_key_and_etag)(request)
+        not_modified = self.get_not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        data = await cache.aget(key, self)
+        if data is not self:
+            await sync_to_async(record_event)(
+                RESPONSE_CACHE_NAMESPACE, "hits", sampled=True
+            )
+            return Response(data, headers={"X-Cache": "HIT", "ETag": etag})
+
+        await sync_to_async(record_event)(
+            RESPONSE_CACHE_NAMESPACE, "misses", sampled=True
+        )
+        with primary_reads():
+            response = await self.alist(request, *args, **kwargs)
+        return await sync_to_async(self.store_response)(key, etag, response)
+
+    def get_cache_key_and_etag(self, request) -> Tuple[str, str]:
+        key = make_key(RESPONSE_CACHE_NAMESPACE, *self.get_cache_key_parts(request))
+        return key, quote_etag(key[len(RESPONSE_CACHE_NAMESPACE) + 1 :])
+
+    @staticmethod
+    def get_not_modified(request, etag: str):
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+        return not_modified
+
+    def store_response(self, key: str, etag: str, response):
+        if response.status_code == 200:
+            cache.set(key, response.data, self.get_cache_timeout())
+            response["ETag"] = etag
+        response["X-Cache"] = "MISS"
+        return response
 
 
 class CategoriesApiView(ListAPIView):
     """
     Эндпоинт для вывода всех Категорий.
+    С параметром root=true выводятся только корневые категории,
+    подкатегории вложены на любую глубину.
     """
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
+    def list(self, request, *args, **kwargs):
+        categories = Category.objects.as_tree()
+        if request.query_params.get("root") in ("true", "1"):
+            categories = [category for category in categories if not category.parent_id]
+        serializer = self.get_serializer(categories, many=True)
+        return Response(serializer.data)
+
+
+class AsyncCategoriesApiView(AsyncAPIView, CategoriesApiView):
+    """
+    Асинхронный вариант CategoriesApiView для запуска под ASGI.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        categories = await Category.objects.aas_tree()
+        if request.query_params.get("root") in ("true", "1"):
+            categories = [category for category in categories if not category.parent_id]
+        serializer = self.get_serializer(categories, many=True)
+        return Response(serializer.data)
+
+
+class CategoryTreeApiView(RetrieveAPIView):
+    """
+    Эндпоинт для вывода категории вместе со всеми подкатегориями.
+    """
+
+    serializer_class = CategorySerializer
+
+    def get_object(self):
+        category = get_object_or_404(Category, id=self.kwargs["id"])
+        nodes = Category.objects.subtree(category).as_tree()
+        return next(node for node in nodes if node.id == category.id)
+
 
-class CatalogListAPIView(ListAPIView):
+class CatalogListAPIView(CachedResponseMixin, EagerLoadingViewMixin, ListAPIView):
     """
-    Эндпоинт для получения списка продуктов с дополнительной
-    информацией о количестве отзывов и среднем рейтинге каждого
-    продукта. Поддерживает пагинацию, фильтрацию и сортировку.
+    Эндпоинт для получения списка продуктов с количеством отзывов
+    и средним рейтингом, которые хранятся в самом товаре.
+    Поддерживает пагинацию, фильтрацию и сортировку
+    по ключам из CustomPagination.sort_fields.
+    Карточки строятся из строк values() сериализатором ProductCardSerializer.
     """
 
-    queryset = Product.objects.annotate(
-        reviews_count=Count("reviews"), rating=Avg("reviews__rate")
-    )
+    queryset = Product.objects.all()
     filterset_class = CatalogFilter
-    serializer_class = ProductShortSerializers
+    serializer_class = ProductCardSerializer
     pagination_class = CustomPagination
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filter_backends = [DjangoFilterBackend]
 
 
-class ProductPopularAPIView(RetrieveAPIView):
+class AsyncCatalogListAPIView(AsyncAPIView, CatalogListAPIView):
+    """
+    Асинхронный вариант CatalogListAPIView для запуска под ASGI.
+    Фильтры читают кэш и дерево категорий синхронно и выполняются
+    в потоке; подсчёт, страница и связи карточек загружаются через
+    async ORM одновременно.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aget(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        data = await self.get_serializer(page, many=True).adata()
+        return self.get_paginated_response(data)
+
+
+class CatalogFacetsAPIView(APIView):
+    """
+    Эндпоинт для боковой панели каталога: количество товаров по тегам,
+    гистограмма цен и счётчики бесплатной доставки и наличия
+    для тех же фильтров, что и /api/catalog/.
+    """
+
+    def get(self, request: Request) -> Response:
+        filterset = CatalogFilter(
+            request.query_params, queryset=Product.objects.all(), request=request
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        key = make_key(
+            FACET_CACHE_NAMESPACE,
+            normalize_params(request.query_params, filterset.filters),
+        )
+        facets = cache.get(key)
+        if facets is None:
+            with primary_reads():
+                facets = compute_facets(
+                    filterset.qs,
+                    getattr(settings, "CATALOG_FACET_PRICE_BUCKETS", 10),
+                    filterset.filter_queryset_without("tags"),
+                )
+            cache.set(
+                key, facets, getattr(settings, "CATALOG_FACET_CACHE_TIMEOUT", 300)
+            )
+        return Response(facets)
+
+
+class ProductPopularAPIView(CachedResponseMixin, RetrieveAPIView):
     """
     Эндпоинт для вывода самого популярного товара.
+    С параметром limit выводится список из limit первых товаров
+    рейтинга популярности (см. product.popularity).
     """
 
     serializer_class = ProductShortSerializers
 
-    def get_object(self):
-        return (
-            Product.objects.annotate(
-                reviews_count=Count("reviews"), average_rating=Avg("reviews__rate")
-            )
-            .order_by("-reviews_count")
-            .first()
+    def retrieve(self, request, *args, **kwargs):
+        if "limit" not in request.query_params:
+            return super().retrieve(request, *args, **kwargs)
+
+        limit = request.query_params["limit"]
+        max_limit = getattr(settings, "PRODUCT_POPULAR_MAX_LIMIT", 20)
+        if not limit.isdigit() or not 0 < int(limit) <= max_limit:
+            raise ValidationError({"limit": f"Expected an integer 1..{max_limit}."})
+
+        products = self.get_serializer_class().setup_eager_loading(
+            top_products(int(limit))
         )
+        serializer = self.get_serializer(products, many=True)
+        return Response(serializer.data)
+
+    def get_object(self):
+        products = self.get_serializer_class().setup_eager_loading(top_products(1))
+        return next(iter(products), None)
 
 
-class ProductLimitedAPIView(ListAPIView):
+class ProductLimitedAPIView(CachedResponseMixin, ListAPIView):
     """
-    Эндпоинт для вывода товаров с остатком менее 10.
+    Эндпоинт для вывода товаров с остатком меньше PRODUCT_LIMITED_THRESHOLD.
+    Первыми идут товары с наименьшим остатком; выборка идёт по индексу
+    (count, id) и разбивается на страницы.
     """
 
-    serializer_class = ProductShortSerializers
+    serializer_class = ProductCardSerializer
+    pagination_class = CustomPagination
 
     def get_queryset(self):
-        return Product.objects.filter(count__lt=10)
+        threshold = getattr(settings, "PRODUCT_LIMITED_THRESHOLD", 10)
+        queryset = Product.objects.filter(count__lt=threshold).order_by("count", "id")
+        return self.get_serializer_class().setup_eager_loading(queryset)
 
 
-class SalesListAPIView(ListAPIView):
+class SalesListAPIView(CachedResponseMixin, ListAPIView):
     """
-    Эндпоинт для вывода всех товаров со скидкой.
+    Эндпоинт для вывода действующих скидок.
+
+    Список id берётся из снимка действующих скидок (см. catalog.sales),
+    поэтому страница загружается по первичному ключу без COUNT и OFFSET,
+    а кэш ответа истекает не позже ближайшей границы скидок.
     """
 
-    queryset = Sale.objects.all()
     serializer_class = SaleSerializers
     pagination_class = SalePagination
 
+    @cached_property
+    def active_sales(self) -> dict:
+        return get_active_sales()
+
+    def get_cache_key_parts(self, request) -> list:
+        return super().get_cache_key_parts(request) + [self.active_sales["boundary"]]
+
+    def get_cache_timeout(self) -> Optional[int]:
+        timeout = super().get_cache_timeout()
+        boundary = self.active_sales["boundary"]
+        if boundary is None:
+            return timeout
+        remaining = math.ceil((boundary - timezone.now()).total_seconds())
+        return max(min(timeout, remaining), 1)
+
+    def get_queryset(self):
+        return self.get_serializer_class().setup_eager_loading(Sale.objects.all())
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.active_sales["ids"])
+        sales = self.get_queryset().in_bulk(page)
+        serializer = self.get_serializer(
+            [sales[sale_id] for sale_id in page if sale_id in sales], many=True
+        )
+        return self.get_paginated_response(serializer.data)
+
 
-class BannersListAPIView(ListAPIView):
+class BannersListAPIView(APIView):
     """
     Эндпоинт для вывода предметов баннера.
+    Ответ отдаётся готовым JSON-телом из кэша (см. catalog.banners):
+    одно чтение кэша на запрос, база затрагивается только при пересборке.
     """
 
-    queryset = Product.objects.annotate(
-        reviews_count=Count("reviews"), rating=Avg("reviews__rate")
-    )
-    serializer_class = ProductShortSerializers
+    def get(self, request: Request) -> HttpResponse:
+        payload = get_banners()
+        not_modified = get_conditional_response(request, etag=payload["etag"])
+        if not_modified is not None:
+            not_modified["ETag"] = payload["etag"]
+            return not_modified
+        return HttpResponse(
+            payload["body"],
+            content_type="application/json",
+            headers={"ETag": payload["etag"]},
+        )
+
+
+class CatalogExportAPIView(APIView):
+    """
+    Выгрузка всего каталога для администраторов потоком NDJSON
+    (по умолчанию) или CSV: ?output=csv.
+    """
+
+    permission_classes = [IsAdminUser]
+    exporters = {
+        "ndjson": (export_ndjson, "application/x-ndjson", "ndjson"),
+        "csv": (export_csv, "text/csv; charset=utf-8", "csv"),
+    }
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        output = request.query_params.get("output", "ndjson")
+        if output not in self.exporters:
+            raise ValidationError({"output": "Expected 'ndjson' or 'csv'."})
+
+        exporter, content_type, extension = self.exporters[output]
+        chunk_size = getattr(settings, "CATALOG_EXPORT_CHUNK_SIZE", 500)
+        return StreamingHttpResponse(
+            stream_from_replica(exporter(chunk_size)),
+            content_type=content_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="catalog.{extension}"'
+            },
+        )
@@ -1,10 +1,15 @@
 from rest_framework import serializers
 
 from order.models import Order
-from product.serializers import ProductShortSerializers
+from product.serializers import EagerLoadingMixin, ProductShortSerializers
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    prefetch_related_fields = ("products",) + tuple(
+        f"products__{field}"
+        for field in ProductShortSerializers.prefetch_related_fields
+    )
+
     products = serializers.SerializerMethodField(method_name="get_product")
 
     class Meta:
@@ -0,0 +1,52 @@
+from django.dispatch import receiver
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+
+from order.models import Order
+from product.popularity import apply_order_delta
+
+
+def _order_product_ids(order: Order):
+    return list(order.products.values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=Order.products.through)
+def update_popularity_on_order_products_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Поддерживает количество заказов товаров при изменении состава заказов.
+    """
+    if action == "pre_clear":
+        if reverse:
+            instance._popularity_order_count = instance.orders.count()
+        else:
+            instance._popularity_product_ids = _order_product_ids(instance)
+        return
+
+    if action == "post_clear":
+        if reverse:
+            apply_order_delta(
+                [instance.pk], -getattr(instance, "_popularity_order_count", 0)
+            )
+        else:
+            apply_order_delta(getattr(instance, "_popularity_product_ids", []), -1)
+        return
+
+    if action not in ("post_add", "post_remove") or not pk_set:
+        return
+
+    delta = 1 if action == "post_add" else -1
+    if reverse:
+        apply_order_delta([instance.pk], delta * len(pk_set))
+    else:
+        apply_order_delta(pk_set, delta)
+
+
+@receiver(pre_delete, sender=Order)
+def remember_order_products(sender, instance, **kwargs):
+    instance._popularity_product_ids = _order_product_ids(instance)
+
+
+@receiver(post_delete, sender=Order)
+def update_popularity_on_order_deleted(sender, instance, **kwargs):
+    apply_order_delta(getattr(instance, "_popularity_product_ids", []), -1)
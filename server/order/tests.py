@@ -106,6 +106,16 @@ class TestOrdersApiView(APITestCase):
         }
         self.assertTrue(expected_keys.issubset(first_order.keys()))
 
+    def test_get_orders_query_count(self):
+        """
+        GET /orders Количество запросов не зависит от количества заказов и товаров.
+        """
+        self.product1.images.add(self.image1, self.image2)
+        self.order2.products.add(self.product1)
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("orders"))
+        self.assertEqual(len(response.data), 2)
+
     def test_create_order(self):
         """
         POST /orders/ Тестирование создания нового заказа.
@@ -148,3 +158,21 @@ class TestOrdersApiView(APITestCase):
         response = self.client.post(order_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["status"], "accepted")
+
+    def test_orders_count_maintained(self):
+        """
+        Тестирование счётчика заказов и популярности товаров.
+        """
+        self.order1.products.add(self.product2)
+        self.product2.refresh_from_db()
+        self.assertEqual(self.product2.orders_count, 2)
+        self.assertGreater(self.product2.popularity, 0)
+
+        self.order2.delete()
+        self.product2.refresh_from_db()
+        self.assertEqual(self.product2.orders_count, 1)
+
+        self.product1.orders.clear()
+        self.product1.refresh_from_db()
+        self.assertEqual(self.product1.orders_count, 0)
+        self.assertEqual(self.product1.popularity, 0)
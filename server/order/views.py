@@ -10,7 +10,7 @@ from order.serializers import OrderSerializer
 
 class OrderApiView(APIView):
     def get(self, request: Request) -> Response:
-        queryset = Order.objects.all()
+        queryset = OrderSerializer.setup_eager_loading(Order.objects.all())
         serializer = OrderSerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -26,7 +26,9 @@ class OrderApiView(APIView):
 
 class OrderDetailsApiView(APIView):
     def get(self, request: Request, id: int) -> Response:
-        order = get_object_or_404(Order, id=id)
+        order = get_object_or_404(
+            OrderSerializer.setup_eager_loading(Order.objects.all()), id=id
+        )
         serializer = OrderSerializer(order)
         return Response(serializer.data, status.HTTP_200_OK)
 
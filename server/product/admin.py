@@ -17,9 +17,29 @@ class ReviewAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "category", "price", "count", "freeDelivery", "date")
+    list_display = (
+        "id",
+        "title",
+        "category",
+        "price",
+        "effective_price",
+        "count",
+        "freeDelivery",
+        "date",
+        "reviews_count",
+        "rating",
+        "orders_count",
+        "popularity",
+    )
     list_filter = ("category", "freeDelivery", "date")
-    search_fields = ("title", "description", "fullDescription")
+    search_fields = ("sku", "title", "description", "fullDescription")
+    readonly_fields = (
+        "effective_price",
+        "reviews_count",
+        "rating",
+        "orders_count",
+        "popularity",
+    )
     filter_horizontal = ("images", "tags", "reviews")
 
 
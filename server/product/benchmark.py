@@ -0,0 +1,420 @@
+import io
+import json
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.test.utils import CaptureQueriesContext
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from order.models import Order
+from catalog.models import Category
+from basket.models import BasketItem
+from product.models import Product
+from product.seeding import MarketplaceSeeder
+from server.parsers import FastJSONParser
+from server.renderers import FastJSONRenderer
+from product.serializers import ProductCardSerializer, ProductShortSerializers
+
+BUDGETS_PATH = Path(__file__).with_name("query_budgets.json")
+BENCHMARK_PASSWORD = "benchmark-password"
+# Наборы данных для проверки масштабирования: число запросов эндпоинта
+# не должно зависеть от объёма данных.
+SCALING_FIXTURES = {
+    "small": {
+        "products": 20,
+        "categories": 4,
+        "tags": 6,
+        "reviews": 60,
+        "sales": 6,
+        "users": 3,
+        "baskets": 2,
+        "orders": 10,
+    },
+    "large": {
+        "products": 200,
+        "categories": 20,
+        "tags": 30,
+        "reviews": 800,
+        "sales": 40,
+        "users": 10,
+        "baskets": 6,
+        "orders": 100,
+    },
+}
+
+
+@dataclass
+class Case:
+    """
+    Запрос к эндпоинту: ``route`` совпадает с шаблоном из server/urls.py,
+    ``path`` может подставлять id из образца данных.
+    """
+
+    route: str
+    label: str = ""
+    method: str = "get"
+    path: Optional[Callable[[dict], str]] = None
+    params: Callable[[dict], object] = lambda sample: None
+    login: bool = False
+    # Подготовка данных внутри откатываемой транзакции замера.
+    setup: Optional[Callable[[dict], None]] = None
+    content_type: str = "application/json"
+    extra: Dict = field(default_factory=dict)
+
+    def url(self, sample: dict) -> str:
+        return self.path(sample) if self.path else "/" + self.route
+
+    @property
+    def key(self) -> str:
+        """
+        Ключ эндпоинта в отчёте и в файле бюджетов: не зависит от id в данных.
+        """
+        key = f"{self.method.upper()} /{self.route}"
+        return f"{key} [{self.label}]" if self.label else key
+
+
+def sign_in_payload(sample: dict) -> dict:
+    return {
+        json.dumps({"username": sample["username"], "password": BENCHMARK_PASSWORD}): ""
+    }
+
+
+def set_password(sample: dict) -> None:
+    """
+    У пользователей сидера нет пароля; замер входа задаёт его на время
+    откатываемой транзакции.
+    """
+    user = User.objects.get(pk=sample["user"].pk)
+    user.set_password(BENCHMARK_PASSWORD)
+    user.save(update_fields=["password"])
+
+
+def grant_staff(sample: dict) -> None:
+    User.objects.filter(pk=sample["user"].pk).update(is_staff=True)
+
+
+CASES = [
+    Case("api/catalog/"),
+    Case(
+        "api/catalog/",
+        "sort",
+        params=lambda s: {"sort": "price", "sortType": "inc"},
+    ),
+    Case("api/catalog/", "search", params=lambda s: {"name": "smart phone"}),
+    Case("api/catalog/", "category", params=lambda s: {"category": s["category"]}),
+    Case("api/catalog/", "cursor", params=lambda s: {"cursor": "", "sort": "rating"}),
+    Case("api/catalog/facets/"),
+    Case("api/catalog/export/", login=True, setup=grant_staff),
+    Case("api/categories/"),
+    Case(
+        "api/categories/<int:id>/", path=lambda s: f"/api/categories/{s['category']}/"
+    ),
+    Case("api/products/popular/"),
+    Case("api/products/limited/"),
+    Case("api/sales/"),
+    Case("api/banners/"),
+    Case("api/tags/"),
+    Case("api/product/<int:id>/", path=lambda s: f"/api/product/{s['product']}/"),
+    Case(
+        "api/product/<int:id>/reviews/",
+        method="post",
+        path=lambda s: f"/api/product/{s['product']}/reviews/",
+        params=lambda s: {
+            "author": "bench",
+            "email": "b@example.com",
+            "text": "ok",
+            "rate": 5,
+        },
+        login=True,
+    ),
+    Case("api/basket/", login=True),
+    Case(
+        "api/basket/",
+        "add",
+        method="post",
+        params=lambda s: {"id": s["new_product"], "count": 1},
+        login=True,
+    ),
+    Case("api/orders", login=True),
+    Case("api/order/<int:id>", path=lambda s: f"/api/order/{s['order']}", login=True),
+    Case("api/profile/", login=True),
+    Case(
+        "api/sign-in/",
+        method="post",
+        params=sign_in_payload,
+        setup=set_password,
+        content_type="application/x-www-form-urlencoded",
+    ),
+    Case("api/sign-out/", method="post", login=True),
+]
+
+# Эндпоинты, которые меняют пароль, аватар или создают пользователей,
+# в прогон не входят: их стоимость определяется хэшированием и файлами.
+SKIPPED_ROUTES = {
+    "api/sign-up/",
+    "api/profile/avatar/",
+    "api/profile/password/",
+}
+
+
+def iter_routes(patterns=None, prefix: str = ""):
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route
+
+
+def api_routes() -> List[str]:
+    return sorted({route for route in iter_routes() if route.startswith("api/")})
+
+
+def page_cases() -> List[Case]:
+    """
+    Страницы фронтенда: шаблоны без обращений к API, id подставляется из образца.
+    """
+    return [
+        Case(
+            route,
+            path=lambda sample, route=route: "/"
+            + route.replace("<int:id>", str(sample["product"])),
+        )
+        for route in sorted(set(iter_routes()))
+        if not route.startswith(("api/", "admin/", "__debug__/"))
+    ]
+
+
+def percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(share * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_sample() -> dict:
+    user = User.objects.order_by("id").first()
+    return {
+        "product": Product.objects.order_by("-popularity", "id").values_list(
+            "id", flat=True
+        )[0],
+        "category": Category.objects.filter(parent=None)
+        .order_by("id")
+        .values_list("id", flat=True)[0],
+        "order": Order.objects.order_by("id").values_list("id", flat=True)[0],
+        # Товар вне корзины: первый запрос добавляет позицию, остальные её меняют.
+        "new_product": Product.objects.exclude(
+            id__in=BasketItem.objects.filter(basket__user=user).values("product_id")
+        )
+        .order_by("id")
+        .values_list("id", flat=True)[0],
+        "user": user,
+        "username": user.username,
+    }
+
+
+def measure(case: Case, sample: dict, iterations: int) -> dict:
+    """
+    Выполняет запрос ``iterations`` раз внутри откатываемой транзакции,
+    так что пишущие эндпоинты не меняют набор данных. Кэш очищается
+    перед первым запросом: он измеряет холодный путь, остальные тёплый.
+    """
+    client = Client(SERVER_NAME="localhost", REMOTE_ADDR="192.0.2.1")
+    url = case.url(sample)
+    timings, queries, statuses = [], [], set()
+    with transaction.atomic():
+        if case.setup:
+            case.setup(sample)
+        if case.login:
+            client.force_login(sample["user"])
+        cache.clear()
+        for _ in range(iterations):
+            request = getattr(client, case.method)
+            kwargs = dict(case.extra)
+            data = case.params(sample)
+            if case.method != "get":
+                kwargs["content_type"] = case.content_type
+                if case.content_type == "application/json":
+                    data = json.dumps(data or {})
+                else:
+                    data = urlencode(data or {})
+            # Клиент очищает журнал запросов в начале запроса, поэтому
+            # отсчёт должен начинаться с пустого журнала.
+            reset_queries()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = request(url, data, **kwargs)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+            if case.login and case.route == "api/sign-out/":
+                client.force_login(sample["user"])
+        transaction.set_rollback(True)
+
+    return {
+        "method": case.method.upper(),
+        "url": url,
+        "params": case.params(sample) if case.method == "get" else None,
+        "status": sorted(statuses),
+        "p50_ms": round(percentile(timings, 0.5), 2),
+        "p95_ms": round(percentile(timings, 0.95), 2),
+        "queries_cold": queries[0],
+        "queries_warm": queries[-1],
+    }
+
+
+def run_benchmark(iterations: int = 20) -> dict:
+    sample = load_sample()
+    results = {}
+    for case in CASES + page_cases():
+        results[case.key] = measure(case, sample, iterations)
+
+    covered = {case.route for case in CASES} | SKIPPED_ROUTES
+    return {
+        "iterations": iterations,
+        "dataset": {
+            "products": Product.objects.count(),
+            "categories": Category.objects.count(),
+            "orders": Order.objects.count(),
+        },
+        "endpoints": results,
+        "skipped": sorted(SKIPPED_ROUTES),
+        "uncovered": [route for route in api_routes() if route not in covered],
+    }
+
+
+def endpoint_queries(result: dict) -> int:
+    return max(result["queries_cold"], result["queries_warm"])
+
+
+def load_budgets(path: Path = BUDGETS_PATH) -> Dict[str, int]:
+    with open(path, encoding="utf-8") as budgets:
+        return json.load(budgets)
+
+
+def write_budgets(report: dict, path: Path = BUDGETS_PATH) -> None:
+    budgets = {
+        name: endpoint_queries(result) for name, result in report["endpoints"].items()
+    }
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(budgets, output, indent=2, sort_keys=True)
+        output.write("\n")
+
+
+def check_budgets(report: dict, budgets: Dict[str, int]) -> List[str]:
+    """
+    Эндпоинты без бюджета или с числом запросов больше бюджета.
+    """
+    problems = []
+    for name, result in report["endpoints"].items():
+        queries = endpoint_queries(result)
+        if name not in budgets:
+            problems.append(f"{name}: no budget ({queries} queries)")
+        elif queries > budgets[name]:
+            problems.append(f"{name}: {queries} queries, budget {budgets[name]}")
+    return problems
+
+
+def check_scaling(small: dict, large: dict) -> List[str]:
+    """
+    Эндпоинты, у которых число запросов растёт вместе с объёмом данных,
+    как это бывает при N+1 в ``SerializerMethodField``.
+    """
+    problems = []
+    for name, result in large["endpoints"].items():
+        before = small["endpoints"][name]
+        for kind in ("queries_cold", "queries_warm"):
+            if result[kind] > before[kind]:
+                problems.append(
+                    f"{name}: {kind} {before[kind]} -> {result[kind]} "
+                    f"({small['dataset']['products']} -> "
+                    f"{large['dataset']['products']} products)"
+                )
+    return problems
+
+
+def run_scaling(iterations: int = 1, seed: int = 42) -> Dict[str, dict]:
+    """
+    Прогоняет бенчмарк на малом и большом синтетическом наборе. Всё
+    выполняется в откатываемой транзакции, база остаётся без изменений.
+    """
+    reports = {}
+    with transaction.atomic():
+        for name, sizes in SCALING_FIXTURES.items():
+            MarketplaceSeeder.clear()
+            MarketplaceSeeder(seed=seed, **sizes).run()
+            reports[name] = run_benchmark(iterations=iterations)
+        transaction.set_rollback(True)
+    return reports
+
+
+def best_time(action: Callable, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def serializer_throughput(limit: int = 500, rounds: int = 5) -> Dict[str, dict]:
+    """
+    Сравнивает скорость сериализации ``limit`` карточек товаров эталонным
+    ProductShortSerializers и ProductCardSerializer, включая запросы к базе.
+    """
+    queryset = Product.objects.order_by("id")[:limit]
+    serializers = {
+        "ProductShortSerializers": lambda: ProductShortSerializers(
+            ProductShortSerializers.setup_eager_loading(queryset), many=True
+        ).data,
+        "ProductCardSerializer": lambda: ProductCardSerializer(
+            ProductCardSerializer.setup_eager_loading(queryset), many=True
+        ).data,
+    }
+    results = {}
+    for name, serialize in serializers.items():
+        rows = len(serialize())
+        best = best_time(serialize, rounds)
+        results[name] = {
+            "rows": rows,
+            "best_ms": round(best * 1000, 2),
+            "rows_per_second": round(rows / best) if best else 0,
+        }
+    return results
+
+
+def renderer_throughput(limit: int = 500, rounds: int = 5) -> Dict[str, dict]:
+    """
+    Сравнивает JSONRenderer/JSONParser с FastJSONRenderer/FastJSONParser
+    на ответе из ``limit`` карточек товаров.
+    """
+    queryset = ProductCardSerializer.setup_eager_loading(
+        Product.objects.order_by("id")[:limit]
+    )
+    data = ProductCardSerializer(queryset, many=True).data
+    body = JSONRenderer().render(data)
+    pairs = {
+        "JSONRenderer": (JSONRenderer(), JSONParser()),
+        "FastJSONRenderer": (FastJSONRenderer(), FastJSONParser()),
+    }
+    results = {}
+    for name, (renderer, parser) in pairs.items():
+        render = best_time(lambda: renderer.render(data), rounds)
+        parse = best_time(lambda: parser.parse(io.BytesIO(body)), rounds)
+        results[name] = {
+            "rows": len(data),
+            "bytes": len(body),
+            "render_ms": round(render * 1000, 2),
+            "parse_ms": round(parse * 1000, 2),
+        }
+    return results
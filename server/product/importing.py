@@ -0,0 +1,321 @@
+import csv
+import json
+import time
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+
+from tags.models import Tag
+from catalog.models import Category
+from catalog.cache import invalidate_tag_ids
+from catalog.signals import invalidate_listing_caches
+from product.search import index_products
+from product.models import Product, ProductImage
+from product.pricing import refresh_effective_prices
+
+PRICE_QUANTUM = Decimal("0.01")
+# Product.price: DecimalField(max_digits=10, decimal_places=2).
+MAX_PRICE = Decimal("99999999.99")
+TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+PRODUCT_FIELDS = (
+    "title",
+    "description",
+    "fullDescription",
+    "price",
+    "count",
+    "freeDelivery",
+    "category_id",
+)
+
+
+class FeedError(ValueError):
+    """
+    Ошибка в строке фида: номер строки и описание проблемы.
+    """
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+
+
+def read_csv(stream) -> Iterator[Dict]:
+    yield from csv.DictReader(stream)
+
+
+def read_ndjson(stream) -> Iterator[str]:
+    """
+    Непустые строки NDJSON; разбираются в clean_row, чтобы ошибка
+    получила номер строки.
+    """
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+def split_list(value) -> List[str]:
+    """
+    Список значений: в NDJSON это массив, в CSV строка через ``|``.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split("|")
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError("expected a list of strings")
+    return [item.strip() for item in value if item.strip()]
+
+
+def parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class ProductImporter:
+    """
+    Пакетная загрузка товаров из фида с идентификацией по ``sku``.
+
+    Категории, теги и изображения сопоставляются через словари в памяти,
+    товары создаются и обновляются bulk-запросами, по транзакции на пачку.
+    Повторная загрузка того же фида ничего не меняет: записываются только
+    товары с отличающимися полями или связями.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.stats = {"rows": 0, "created": 0, "updated": 0, "unchanged": 0}
+        self.categories = dict(
+            Category.objects.order_by("-id").values_list("title", "id")
+        )
+        self.tags = {
+            name.lower(): tag_id
+            for tag_id, name in Tag.objects.values_list("id", "name")
+        }
+        self.changed_ids: Set[int] = set()
+
+    def run(self, rows: Iterable[Dict]) -> dict:
+        started = time.monotonic()
+        for number, batch in enumerate(batched(rows, self.batch_size)):
+            first_line = number * self.batch_size + 1
+            with transaction.atomic():
+                changed = self.import_batch(batch, first_line)
+                if changed:
+                    self.after_batch(changed)
+            self.changed_ids.update(changed)
+
+        elapsed = time.monotonic() - started
+        self.stats["seconds"] = elapsed
+        self.stats["rows_per_second"] = self.stats["rows"] / elapsed if elapsed else 0
+        return self.stats
+
+    def import_batch(self, batch: List[Dict], first_line: int) -> List[int]:
+        rows = [self.clean_row(row, line) for line, row in enumerate(batch, first_line)]
+        rows = list({row["sku"]: row for row in rows}.values())
+        self.stats["rows"] += len(batch)
+
+        existing = Product.objects.in_bulk(
+            [row["sku"] for row in rows], field_name="sku"
+        )
+        to_create, to_update, changed_skus = [], [], set()
+        for row in rows:
+            product = existing.get(row["sku"])
+            if product is None:
+                to_create.append(Product(sku=row["sku"], **row["fields"]))
+                changed_skus.add(row["sku"])
+                continue
+            fields = {
+                name: value
+                for name, value in row["fields"].items()
+                if getattr(product, name) != value
+            }
+            if fields:
+                for name, value in fields.items():
+                    setattr(product, name, value)
+                to_update.append(product)
+                changed_skus.add(row["sku"])
+
+        Product.objects.bulk_create(to_create, batch_size=self.batch_size)
+        if to_update:
+            Product.objects.bulk_update(
+                to_update, PRODUCT_FIELDS, batch_size=self.batch_size
+            )
+        self.stats["created"] += len(to_create)
+
+        ids = dict(
+            Product.objects.filter(sku__in=[row["sku"] for row in rows]).values_list(
+                "sku", "id"
+            )
+        )
+        changed_skus |= self.sync_relation(rows, ids, "tags", self.resolve_tags(rows))
+        changed_skus |= self.sync_relation(
+            rows, ids, "images", self.resolve_images(rows)
+        )
+
+        updated = len(changed_skus) - len(to_create)
+        self.stats["updated"] += updated
+        self.stats["unchanged"] += len(rows) - len(changed_skus)
+        return [ids[sku] for sku in changed_skus]
+
+    def clean_row(self, row, line: int) -> Dict:
+        if isinstance(row, str):
+            try:
+                row = json.loads(row)
+            except ValueError:
+                raise FeedError(line, "invalid JSON")
+        if not isinstance(row, dict):
+            raise FeedError(line, "row must be an object")
+
+        sku = str(row.get("sku") or "").strip()
+        if not sku:
+            raise FeedError(line, "sku is required")
+        title = str(row.get("title") or "").strip()
+        if not title:
+            raise FeedError(line, "title is required")
+        try:
+            price = Decimal(str(row.get("price")))
+            count = int(row.get("count") or 0)
+        except (ArithmeticError, TypeError, ValueError):
+            raise FeedError(line, "price and count must be numbers")
+        if not price.is_finite():
+            raise FeedError(line, "price and count must be numbers")
+        if price < 0 or count < 0:
+            raise FeedError(line, "price and count must not be negative")
+        if price > MAX_PRICE:
+            raise FeedError(line, f"price must not exceed {MAX_PRICE}")
+        price = price.quantize(PRICE_QUANTUM)
+        try:
+            tags = split_list(row.get("tags")) if "tags" in row else None
+            images = split_list(row.get("images")) if "images" in row else None
+        except ValueError as error:
+            raise FeedError(line, f"tags and images: {error}")
+
+        return {
+            "sku": sku,
+            "fields": {
+                "title": title,
+                "description": row.get("description") or None,
+                "fullDescription": row.get("fullDescription") or None,
+                "price": price,
+                "count": count,
+                "freeDelivery": parse_bool(row.get("freeDelivery", False)),
+                "category_id": self.resolve_category(row.get("category"), line),
+            },
+            "tags": tags,
+            "images": images,
+        }
+
+    def resolve_category(self, title, line: int) -> int:
+        title = str(title or "").strip()
+        if not title:
+            raise FeedError(line, "category is required")
+        if title not in self.categories:
+            # Категории создаются через save(), чтобы заполнить путь в дереве.
+            self.categories[title] = Category.objects.create(title=title).id
+        return self.categories[title]
+
+    def resolve_tags(self, rows: List[Dict]) -> Dict[str, int]:
+        names = {name for row in rows for name in row["tags"] or ()}
+        missing = {name for name in names if name.lower() not in self.tags}
+        if missing:
+            Tag.objects.bulk_create(
+                [Tag(name=name) for name in missing], ignore_conflicts=True
+            )
+            for tag_id, name in Tag.objects.filter(name__in=missing).values_list(
+                "id", "name"
+            ):
+                self.tags[name.lower()] = tag_id
+        return {name: self.tags[name.lower()] for name in names}
+
+    def resolve_images(self, rows: List[Dict]) -> Dict[str, int]:
+        sources = {src for row in rows for src in row["images"] or ()}
+        images = dict(
+            ProductImage.objects.filter(src__in=sources)
+            .order_by("-id")
+            .values_list("src", "id")
+        )
+        missing = sources - images.keys()
+        if missing:
+            ProductImage.objects.bulk_create(
+                [ProductImage(src=src, alt="") for src in missing]
+            )
+            images.update(
+                ProductImage.objects.filter(src__in=missing).values_list("src", "id")
+            )
+        return images
+
+    def sync_relation(
+        self, rows: List[Dict], ids: Dict[str, int], relation: str, targets: Dict
+    ) -> Set[str]:
+        """
+        Приводит связи товаров к составу из фида. Возвращает sku товаров,
+        у которых связи изменились.
+        """
+        field = getattr(Product, relation).field
+        through = field.remote_field.through
+        target_name = field.m2m_reverse_field_name()
+        target_field = f"{target_name}_id"
+        rows = [row for row in rows if row[relation] is not None]
+        if not rows:
+            return set()
+
+        current: Dict[int, Set[int]] = {}
+        links = through.objects.filter(
+            product_id__in=[ids[row["sku"]] for row in rows]
+        ).values_list("product_id", target_field)
+        for product_id, target_id in links:
+            current.setdefault(product_id, set()).add(target_id)
+
+        changed, to_add, to_remove = set(), [], Q(pk__in=[])
+        for row in rows:
+            product_id = ids[row["sku"]]
+            wanted = {targets[value] for value in row[relation]}
+            have = current.get(product_id, set())
+            if wanted == have:
+                continue
+            changed.add(row["sku"])
+            to_add += [(product_id, target) for target in wanted - have]
+            if have - wanted:
+                to_remove |= Q(
+                    product_id=product_id, **{f"{target_field}__in": have - wanted}
+                )
+
+        through.objects.filter(to_remove).delete()
+        through.objects.bulk_create(
+            [
+                through(product_id=product_id, **{target_field: target_id})
+                for product_id, target_id in to_add
+            ],
+            ignore_conflicts=True,
+        )
+        return changed
+
+    def after_batch(self, product_ids: List[int]) -> None:
+        """
+        bulk-запросы не вызывают сигналы, поэтому производные данные
+        товаров пачки обновляются явно. Кэши сбрасываются после фиксации
+        каждой пачки: при ошибке в следующей пачке уже загруженные товары
+        не остаются за устаревшим кэшем.
+        """
+        index_products(product_ids)
+        refresh_effective_prices(product_ids)
+        Product.objects.filter(id__in=product_ids).touch()
+        transaction.on_commit(invalidate_tag_ids)
+        transaction.on_commit(invalidate_listing_caches)
+
+
+def import_products(path: str, fmt: str, batch_size: int) -> Tuple[dict, Set[int]]:
+    importer = ProductImporter(batch_size=batch_size)
+    with open(path, newline="", encoding="utf-8") as stream:
+        stats = importer.run(READERS[fmt](stream))
+    return stats, importer.changed_ids
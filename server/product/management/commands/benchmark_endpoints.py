@@ -0,0 +1,74 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from product.benchmark import (
+    check_budgets,
+    check_scaling,
+    load_budgets,
+    run_benchmark,
+    run_scaling,
+    write_budgets,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет p50/p95 задержки и количество запросов к базе для "
+        "эндпоинтов из server/urls.py и сохраняет результат в JSON. "
+        "С --check сравнивает число запросов с product/query_budgets.json "
+        "на малом и большом синтетическом наборе."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--output", default="benchmark.json")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Проверить бюджеты запросов и их независимость от объёма данных.",
+        )
+        parser.add_argument(
+            "--update-budgets",
+            action="store_true",
+            help="Записать текущее число запросов как новые бюджеты.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"] or options["update_budgets"]:
+            return self.check_budgets(options)
+
+        try:
+            report = run_benchmark(iterations=options["iterations"])
+        except IndexError:
+            raise CommandError("No data to benchmark, run seed_marketplace first.")
+        self.write_report(report, options["output"])
+
+    def check_budgets(self, options):
+        reports = run_scaling(iterations=options["iterations"])
+        self.write_report(reports, options["output"], summary=reports["large"])
+        if options["update_budgets"]:
+            write_budgets(reports["large"])
+            self.stdout.write(self.style.SUCCESS("Бюджеты обновлены."))
+
+        problems = check_scaling(reports["small"], reports["large"])
+        problems += check_budgets(reports["large"], load_budgets())
+        if problems:
+            raise CommandError("\n".join(problems))
+        self.stdout.write(self.style.SUCCESS("Бюджеты запросов соблюдены."))
+
+    def write_report(self, report: dict, path: str, summary: dict = None):
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2, sort_keys=True, ensure_ascii=False)
+            output.write("\n")
+
+        summary = summary or report
+        for name, result in summary["endpoints"].items():
+            self.stdout.write(
+                f"{name:45} p50 {result['p50_ms']:8.2f} ms  "
+                f"p95 {result['p95_ms']:8.2f} ms  queries {result['queries_cold']}"
+                f"/{result['queries_warm']}  {result['status']}"
+            )
+        if summary["uncovered"]:
+            self.stdout.write(f"Не покрыты: {', '.join(summary['uncovered'])}")
+        self.stdout.write(self.style.SUCCESS(f"Отчёт: {path}"))
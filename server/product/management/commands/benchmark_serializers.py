@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from product.benchmark import renderer_throughput, serializer_throughput
+
+
+class Command(BaseCommand):
+    help = "Сравнивает скорость сериализации и рендеринга JSON карточек товаров."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=500)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        results = serializer_throughput(options["limit"], options["rounds"])
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:25} {result['rows']} строк  {result['best_ms']:8.2f} ms  "
+                f"{result['rows_per_second']} строк/с"
+            )
+
+        results = renderer_throughput(options["limit"], options["rounds"])
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:25} {result['bytes']} байт  render {result['render_ms']:8.2f} ms"
+                f"  parse {result['parse_ms']:8.2f} ms"
+            )
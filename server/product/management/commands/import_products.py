@@ -0,0 +1,36 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from product.importing import READERS, FeedError, import_products
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает товары из CSV или NDJSON фида пачками. "
+        "Товары сопоставляются по sku, повторная загрузка идемпотентна."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=sorted(READERS), default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+        if fmt not in READERS:
+            raise CommandError("Unknown feed format, use --format csv|ndjson.")
+
+        try:
+            stats, _ = import_products(path, fmt, options["batch_size"])
+        except (OSError, UnicodeDecodeError, FeedError) as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Строк: {stats['rows']}, создано: {stats['created']}, "
+                f"обновлено: {stats['updated']}, без изменений: {stats['unchanged']}, "
+                f"{stats['rows_per_second']:.0f} строк/с"
+            )
+        )
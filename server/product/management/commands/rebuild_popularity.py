@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from catalog.signals import invalidate_responses
+from product.popularity import rebuild_popularity
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает количество заказов и популярность всех товаров."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        processed = rebuild_popularity(batch_size=options["batch_size"])
+        invalidate_responses()
+        self.stdout.write(self.style.SUCCESS(f"Обновлено товаров: {processed}"))
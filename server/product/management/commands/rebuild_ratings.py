@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from product.ratings import rebuild_ratings
+from catalog.signals import invalidate_responses
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает количество отзывов и рейтинг всех товаров."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        processed = rebuild_ratings(batch_size=options["batch_size"])
+        invalidate_responses()
+        self.stdout.write(self.style.SUCCESS(f"Обновлено товаров: {processed}"))
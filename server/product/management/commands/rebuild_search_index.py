@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from product.search import index_products
+
+
+class Command(BaseCommand):
+    help = "Перестраивает поисковый индекс всех товаров."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        indexed = index_products(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано товаров: {indexed}"))
@@ -0,0 +1,41 @@
+import time
+
+from django.utils import timezone
+from django.core.management.base import BaseCommand
+
+from product.models import Product
+from catalog.sales import next_boundary
+from product.pricing import apply_sale_boundaries
+from catalog.signals import invalidate_listing_caches
+
+
+class Command(BaseCommand):
+    help = (
+        "Поддерживает effective_price товаров: применяет и отменяет скидки "
+        "в моменты начала и окончания их действия."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true")
+        parser.add_argument("--max-sleep", type=float, default=60.0)
+
+    def handle(self, *args, **options):
+        while True:
+            moment = timezone.now()
+            changed = apply_sale_boundaries(moment)
+            if changed:
+                Product.objects.filter(id__in=changed).touch()
+                invalidate_listing_caches()
+            self.stdout.write(self.style.SUCCESS(f"Обновлено цен: {len(changed)}"))
+
+            if options["once"]:
+                return
+
+            # Новые и изменённые скидки применяются сигналами сразу,
+            # поэтому ждём ближайшую границу, но не дольше max-sleep.
+            delay = options["max_sleep"]
+            boundary = next_boundary(moment)
+            if boundary is not None:
+                remaining = (boundary - timezone.now()).total_seconds()
+                delay = min(delay, max(remaining, 0) + 0.01)
+            time.sleep(delay)
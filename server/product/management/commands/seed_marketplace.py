@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.cache import invalidate_tag_ids
+from catalog.signals import invalidate_listing_caches
+from product.models import Product
+from product.seeding import DEFAULTS, SEED_PREFIX, MarketplaceSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу воспроизводимым синтетическим набором данных "
+        "для нагрузочных замеров (benchmark_endpoints)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--clear", action="store_true", help="Удалить ранее созданные данные."
+        )
+        for name, default in DEFAULTS.items():
+            parser.add_argument(f"--{name}", type=int, default=default)
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            MarketplaceSeeder.clear()
+        elif Product.objects.filter(sku__startswith=SEED_PREFIX).exists():
+            raise CommandError("Seed data already exists, run with --clear.")
+
+        sizes = {name: options[name] for name in DEFAULTS}
+        seeder = MarketplaceSeeder(
+            seed=options["seed"], batch_size=options["batch_size"], **sizes
+        )
+        created = seeder.run()
+        invalidate_tag_ids()
+        invalidate_listing_caches()
+        summary = ", ".join(f"{name}: {amount}" for name, amount in created.items())
+        self.stdout.write(self.style.SUCCESS(f"Создано — {summary}"))
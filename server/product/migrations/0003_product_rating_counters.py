@@ -0,0 +1,45 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:18
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rating_counters(apps, schema_editor):
+    Product = apps.get_model("product", "Product")
+    products = Product.objects.annotate(
+        total_reviews=Count("reviews"), total_rate=Sum("reviews__rate")
+    )
+    for product in products.iterator():
+        total_rate = product.total_rate or 0
+        product.reviews_count = product.total_reviews
+        product.rating_sum = total_rate
+        product.rating = (
+            total_rate / product.total_reviews if product.total_reviews else 0.0
+        )
+        product.save(update_fields=["reviews_count", "rating_sum", "rating"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0002_alter_review_author"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="rating",
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="reviews_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rating_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from product.search import search_document, weighted_fields, weighted_terms
+
+
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute(
+            "ALTER TABLE product_productsearchdocument "
+            "ADD FULLTEXT INDEX product_search_document_ft (document)"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute(
+            "ALTER TABLE product_productsearchdocument "
+            "DROP INDEX product_search_document_ft"
+        )
+
+
+def fill_search_index(apps, schema_editor):
+    Product = apps.get_model("product", "Product")
+    ProductSearchTerm = apps.get_model("product", "ProductSearchTerm")
+    ProductSearchDocument = apps.get_model("product", "ProductSearchDocument")
+    use_fulltext = schema_editor.connection.vendor == "mysql"
+
+    products = Product.objects.select_related("category").prefetch_related("tags")
+    for product in products.iterator(chunk_size=500):
+        fields = weighted_fields(
+            product.title,
+            product.description,
+            [tag.name for tag in product.tags.all()],
+            product.category.title,
+        )
+        if use_fulltext:
+            ProductSearchDocument.objects.create(
+                product=product, document=search_document(fields)
+            )
+        else:
+            ProductSearchTerm.objects.bulk_create(
+                ProductSearchTerm(product=product, term=term, weight=weight)
+                for term, weight in weighted_terms(fields).items()
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0003_product_rating_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductSearchDocument",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="product.product",
+                    ),
+                ),
+                ("document", models.TextField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ProductSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=64)),
+                ("weight", models.PositiveIntegerField(default=1)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="product.product",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["term", "product"], name="product_pro_term_aab229_idx"
+                    )
+                ],
+                "unique_together": {("product", "term")},
+            },
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:37
+
+from django.db import migrations, models
+from django.db.models import Count
+
+from product.popularity import popularity_score
+
+
+def fill_popularity(apps, schema_editor):
+    Product = apps.get_model("product", "Product")
+    products = Product.objects.annotate(total_orders=Count("orders"))
+    for product in products.iterator():
+        product.orders_count = product.total_orders
+        product.popularity = popularity_score(
+            product.reviews_count, product.rating, product.total_orders
+        )
+        product.save(update_fields=["orders_count", "popularity"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0002_category_path"),
+        ("product", "0005_product_version"),
+        ("tags", "0001_initial"),
+        ("order", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="orders_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="popularity",
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["-popularity", "id"], name="product_popularity_idx"
+            ),
+        ),
+        migrations.RunPython(fill_popularity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0002_category_path"),
+        ("product", "0006_product_popularity"),
+        ("tags", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["count", "id"], name="product_count_idx"),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0003_banner"),
+        ("product", "0009_product_sort_indexes"),
+        ("tags", "0002_tag_name_unique"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "price", "id"], name="product_category_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "date", "id"], name="product_category_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "rating", "id"], name="product_category_rating_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "reviews_count", "id"],
+                name="product_category_reviews_idx",
+            ),
+        ),
+    ]
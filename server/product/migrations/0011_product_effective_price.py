@@ -0,0 +1,59 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:46
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def fill_effective_price(apps, schema_editor):
+    Product = apps.get_model("product", "Product")
+    Sale = apps.get_model("product", "Sale")
+    Product.objects.update(effective_price=F("price"))
+
+    now = timezone.now()
+    active = Sale.objects.filter(dateFrom__lte=now, dateTo__gte=now)
+    for sale in active.iterator():
+        Product.objects.filter(
+            pk=sale.product_id, effective_price__gt=sale.salePrice
+        ).update(effective_price=sale.salePrice)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0003_banner"),
+        ("product", "0010_product_category_indexes"),
+        ("tags", "0002_tag_name_unique"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_price_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_category_price_idx",
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="effective_price",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=10
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["effective_price", "id"], name="product_eff_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "effective_price", "id"],
+                name="product_category_eff_price_idx",
+            ),
+        ),
+        migrations.RunPython(fill_effective_price, migrations.RunPython.noop),
+    ]
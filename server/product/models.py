@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 
@@ -19,13 +21,25 @@ class Review(models.Model):
     date = models.DateTimeField(auto_now_add=True)
 
 
+class ProductQuerySet(models.QuerySet):
+    def touch(self) -> int:
+        """
+        Увеличивает версию товаров, по которой строятся ETag и Last-Modified.
+        """
+        return self.update(version=F("version") + 1, updated_at=timezone.now())
+
+
 class Product(models.Model):
     category = models.ForeignKey(
         Category, related_name="products", on_delete=models.CASCADE
     )
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
     price = models.DecimalField(
         max_digits=10, decimal_places=2, validators=[MinValueValidator(0.0)]
     )
+    effective_price = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False
+    )
     count = models.PositiveIntegerField(default=0)
     date = models.DateTimeField(auto_now_add=True)
     title = models.CharField(max_length=100)
@@ -36,14 +50,77 @@ class Product(models.Model):
     tags = models.ManyToManyField(Tag, blank=True)
     reviews = models.ManyToManyField(Review, blank=True)
     specifications = models.JSONField(blank=True, null=True)
+    reviews_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating = models.FloatField(default=0.0, editable=False)
+    orders_count = models.PositiveIntegerField(default=0, editable=False)
+    popularity = models.FloatField(default=0.0, editable=False)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = ProductQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Product"
         verbose_name_plural = "Products"
+        indexes = [
+            models.Index(fields=["-popularity", "id"], name="product_popularity_idx"),
+            models.Index(fields=["count", "id"], name="product_count_idx"),
+            models.Index(
+                fields=["effective_price", "id"], name="product_eff_price_idx"
+            ),
+            models.Index(fields=["date", "id"], name="product_date_idx"),
+            models.Index(fields=["rating", "id"], name="product_rating_idx"),
+            models.Index(fields=["reviews_count", "id"], name="product_reviews_idx"),
+            models.Index(fields=["title", "id"], name="product_title_idx"),
+            models.Index(
+                fields=["category", "effective_price", "id"],
+                name="product_category_eff_price_idx",
+            ),
+            models.Index(
+                fields=["category", "date", "id"], name="product_category_date_idx"
+            ),
+            models.Index(
+                fields=["category", "rating", "id"], name="product_category_rating_idx"
+            ),
+            models.Index(
+                fields=["category", "reviews_count", "id"],
+                name="product_category_reviews_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+        При обновлении не записывает служебные поля (``editable=False``):
+        счётчики отзывов и заказов, рейтинг, популярность, итоговую цену
+        и версию. Их меняют update()-запросы сигналов и команд, значения
+        в памяти могут отставать от базы. Явно перечисленные
+        в ``update_fields`` поля сохраняются как обычно.
+        """
+        if (
+            not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if field.editable and not field.primary_key
+            ]
+        super().save(*args, **kwargs)
+
+
+class SaleQuerySet(models.QuerySet):
+    def active(self, moment=None):
+        """
+        Скидки, действующие в момент ``moment`` (по умолчанию сейчас).
+        """
+        moment = moment or timezone.now()
+        return self.filter(dateFrom__lte=moment, dateTo__gte=moment)
+
 
 class Sale(models.Model):
     product = models.ForeignKey(Product, related_name="sales", on_delete=models.CASCADE)
@@ -54,9 +131,36 @@ class Sale(models.Model):
     dateTo = models.DateTimeField()
     title = models.CharField(max_length=100)
 
+    objects = SaleQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Sale"
         verbose_name_plural = "Sales"
+        indexes = [
+            models.Index(fields=["dateFrom", "dateTo"], name="sale_period_idx"),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class ProductSearchTerm(models.Model):
+    product = models.ForeignKey(
+        Product, related_name="search_terms", on_delete=models.CASCADE
+    )
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ("product", "term")
+        indexes = [models.Index(fields=["term", "product"])]
+
+
+class ProductSearchDocument(models.Model):
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        related_name="search_document",
+        on_delete=models.CASCADE,
+    )
+    document = models.TextField()
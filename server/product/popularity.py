@@ -0,0 +1,110 @@
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Value
+
+from product.models import Product
+
+DEFAULT_POPULARITY_WEIGHTS = {"reviews": 1.0, "rating": 1.0, "orders": 2.0}
+
+
+def popularity_weights() -> dict:
+    weights = dict(DEFAULT_POPULARITY_WEIGHTS)
+    weights.update(getattr(settings, "PRODUCT_POPULARITY_WEIGHTS", {}))
+    return weights
+
+
+def popularity_score(reviews_count: int, rating: float, orders_count: int) -> float:
+    weights = popularity_weights()
+    return (
+        weights["reviews"] * reviews_count
+        + weights["rating"] * rating
+        + weights["orders"] * orders_count
+    )
+
+
+def popularity_expression() -> ExpressionWrapper:
+    """
+    Оценка популярности из сохранённых счётчиков товара.
+    """
+    weights = popularity_weights()
+    return ExpressionWrapper(
+        Value(weights["reviews"]) * F("reviews_count")
+        + Value(weights["rating"]) * F("rating")
+        + Value(weights["orders"]) * F("orders_count"),
+        output_field=FloatField(),
+    )
+
+
+def refresh_popularity(product_ids: Iterable[int]) -> None:
+    product_ids = list(product_ids)
+    if product_ids:
+        Product.objects.filter(id__in=product_ids).update(
+            popularity=popularity_expression()
+        )
+
+
+def apply_order_delta(product_ids: Iterable[int], delta: int) -> None:
+    """
+    Инкрементально изменяет количество заказов товаров и их популярность.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+
+    with transaction.atomic():
+        Product.objects.filter(id__in=product_ids).update(
+            orders_count=F("orders_count") + delta
+        )
+        refresh_popularity(product_ids)
+
+
+def rebuild_popularity(
+    product_ids: Optional[Iterable[int]] = None, batch_size: int = 1000
+) -> int:
+    """
+    Пересчитывает количество заказов и популярность по таблице связей.
+    Возвращает количество обработанных товаров.
+    """
+    queryset = Product.objects.order_by("id")
+    if product_ids is not None:
+        queryset = queryset.filter(id__in=list(product_ids))
+
+    rows = queryset.annotate(total_orders=Count("orders")).values_list(
+        "id", "reviews_count", "rating", "total_orders"
+    )
+
+    processed = 0
+    batch: List[Product] = []
+    for product_id, reviews_count, rating, total_orders in rows.iterator(
+        chunk_size=batch_size
+    ):
+        batch.append(
+            Product(
+                id=product_id,
+                orders_count=total_orders,
+                popularity=popularity_score(reviews_count, rating, total_orders),
+            )
+        )
+        if len(batch) >= batch_size:
+            processed += _save_popularity(batch)
+            batch = []
+
+    if batch:
+        processed += _save_popularity(batch)
+    return processed
+
+
+def top_products(limit: int):
+    """
+    Первые ``limit`` товаров рейтинга популярности.
+    Читаются по индексу (popularity, id) без сортировки всей таблицы.
+    """
+    return Product.objects.order_by("-popularity", "id")[:limit]
+
+
+def _save_popularity(batch: List[Product]) -> int:
+    with transaction.atomic():
+        Product.objects.bulk_update(batch, ["orders_count", "popularity"])
+    return len(batch)
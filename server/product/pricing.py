@@ -0,0 +1,79 @@
+from typing import Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db.models import F, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+
+from product.models import Product, Sale
+
+
+def effective_price_expression(moment) -> Least:
+    """
+    Цена товара с учётом самой выгодной скидки, действующей в момент ``moment``.
+    """
+    sale_price = (
+        Sale.objects.active(moment)
+        .filter(product_id=OuterRef("pk"))
+        .values("product_id")
+        .annotate(min_price=Min("salePrice"))
+        .values("min_price")
+    )
+    return Least(F("price"), Coalesce(Subquery(sale_price), F("price")))
+
+
+def refresh_effective_prices(
+    product_ids: Optional[Iterable[int]] = None, moment=None
+) -> List[int]:
+    """
+    Пересчитывает effective_price одним UPDATE и возвращает id товаров,
+    у которых цена изменилась.
+    """
+    moment = moment or timezone.now()
+    queryset = Product.objects.all()
+    if product_ids is not None:
+        queryset = queryset.filter(id__in=list(product_ids))
+
+    queryset = queryset.annotate(new_price=effective_price_expression(moment))
+    changed = list(
+        queryset.exclude(effective_price=F("new_price")).values_list("id", flat=True)
+    )
+    if changed:
+        Product.objects.filter(id__in=changed).update(
+            effective_price=effective_price_expression(moment)
+        )
+    return changed
+
+
+def crossed_sale_product_ids(since, moment) -> List[int]:
+    """
+    Товары, у скидок которых между ``since`` и ``moment`` наступило
+    начало или окончание действия.
+    """
+    crossed = Q(dateFrom__gt=since, dateFrom__lte=moment) | Q(
+        dateTo__gte=since, dateTo__lt=moment
+    )
+    return list(
+        Sale.objects.filter(crossed).values_list("product_id", flat=True).distinct()
+    )
+
+
+SALE_SCHEDULER_LAST_RUN_KEY = "product:sale-scheduler:last-run"
+
+
+def apply_sale_boundaries(moment=None) -> List[int]:
+    """
+    Применяет начавшиеся и отменяет закончившиеся с прошлого запуска скидки.
+    Без сохранённого времени запуска пересчитываются все товары.
+    """
+    moment = moment or timezone.now()
+    since = cache.get(SALE_SCHEDULER_LAST_RUN_KEY)
+    changed = []
+    if since is None:
+        changed = refresh_effective_prices(moment=moment)
+    elif since < moment:
+        product_ids = crossed_sale_product_ids(since, moment)
+        if product_ids:
+            changed = refresh_effective_prices(product_ids, moment)
+    cache.set(SALE_SCHEDULER_LAST_RUN_KEY, moment, timeout=None)
+    return changed
@@ -0,0 +1,86 @@
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+
+from product.models import Product
+from product.popularity import refresh_popularity
+
+
+def rating_expression() -> Case:
+    """
+    Средняя оценка, вычисляемая из сохранённых счётчиков товара.
+    """
+    return Case(
+        When(reviews_count=0, then=Value(0.0)),
+        default=Cast(F("rating_sum"), FloatField()) / F("reviews_count"),
+        output_field=FloatField(),
+    )
+
+
+def apply_review_delta(
+    product_ids: Iterable[int], count_delta: int, rate_delta: int
+) -> None:
+    """
+    Инкрементально изменяет количество отзывов и сумму оценок товаров.
+
+    Рейтинг и популярность пересчитываются отдельными запросами:
+    MySQL вычисляет присваивания в UPDATE слева направо, и одно
+    выражение увидело бы уже обновлённые счётчики.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+
+    with transaction.atomic():
+        products = Product.objects.filter(id__in=product_ids)
+        products.update(
+            reviews_count=F("reviews_count") + count_delta,
+            rating_sum=F("rating_sum") + rate_delta,
+        )
+        products.update(rating=rating_expression())
+        refresh_popularity(product_ids)
+
+
+def rebuild_ratings(
+    product_ids: Optional[Iterable[int]] = None, batch_size: int = 1000
+) -> int:
+    """
+    Пересчитывает счётчики отзывов по таблице связей.
+    Возвращает количество обработанных товаров.
+    """
+    queryset = Product.objects.order_by("id")
+    if product_ids is not None:
+        queryset = queryset.filter(id__in=list(product_ids))
+
+    rows = queryset.annotate(
+        total_reviews=Count("reviews"), total_rate=Sum("reviews__rate")
+    ).values_list("id", "total_reviews", "total_rate")
+
+    processed = 0
+    batch: List[Product] = []
+    for product_id, total_reviews, total_rate in rows.iterator(chunk_size=batch_size):
+        total_rate = total_rate or 0
+        batch.append(
+            Product(
+                id=product_id,
+                reviews_count=total_reviews,
+                rating_sum=total_rate,
+                rating=total_rate / total_reviews if total_reviews else 0.0,
+            )
+        )
+        if len(batch) >= batch_size:
+            processed += _save_ratings(batch)
+            batch = []
+
+    if batch:
+        processed += _save_ratings(batch)
+    return processed
+
+
+def _save_ratings(batch: List[Product]) -> int:
+    with transaction.atomic():
+        Product.objects.bulk_update(batch, ["reviews_count", "rating_sum", "rating"])
+        refresh_popularity(product.id for product in batch)
+    return len(batch)
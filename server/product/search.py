@@ -0,0 +1,164 @@
+import re
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from django.db import connection, transaction
+from django.db.models import Exists, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from product.models import Product, ProductSearchDocument, ProductSearchTerm
+
+TOKEN_RE = re.compile(r"\w+")
+MAX_TERM_LENGTH = 64
+
+
+def tokenize(text: str) -> List[str]:
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall((text or "").lower())]
+
+
+def weighted_fields(title, description, tag_names, category_title):
+    """
+    Индексируемые поля товара и их веса при ранжировании.
+    """
+    return (
+        (title, 3),
+        (" ".join(tag_names), 2),
+        (category_title, 2),
+        (description, 1),
+    )
+
+
+def weighted_terms(fields) -> Counter:
+    terms = Counter()
+    for text, weight in fields:
+        for token in tokenize(text):
+            terms[token] += weight
+    return terms
+
+
+def search_document(fields) -> str:
+    """
+    Текст для FULLTEXT-индекса: поле повторяется по числу своего веса.
+    """
+    return "\n".join(" ".join([text or ""] * weight) for text, weight in fields)
+
+
+def product_fields(product: Product):
+    return weighted_fields(
+        product.title,
+        product.description,
+        [tag.name for tag in product.tags.all()],
+        product.category.title,
+    )
+
+
+class InvertedIndexBackend:
+    """
+    Инвертированный индекс в таблице терминов (term, product, weight).
+    Работает на любой БД; последний термин запроса ищется по префиксу.
+    """
+
+    def index(self, products: List[Product]) -> None:
+        terms = [
+            ProductSearchTerm(product=product, term=term, weight=weight)
+            for product in products
+            for term, weight in weighted_terms(product_fields(product)).items()
+        ]
+        with transaction.atomic():
+            ProductSearchTerm.objects.filter(product__in=products).delete()
+            ProductSearchTerm.objects.bulk_create(terms, batch_size=1000)
+
+    def search(self, queryset, tokens: List[str]):
+        conditions = [Q(term=token) for token in tokens[:-1]]
+        conditions.append(Q(term__startswith=tokens[-1]))
+
+        matches = ProductSearchTerm.objects.filter(product=OuterRef("pk"))
+        for condition in conditions:
+            queryset = queryset.filter(Exists(matches.filter(condition)))
+
+        any_condition = Q()
+        for condition in conditions:
+            any_condition |= condition
+        relevance = (
+            matches.filter(any_condition)
+            .values("product")
+            .annotate(total=Sum("weight"))
+            .values("total")
+        )
+        return queryset.annotate(
+            relevance=Coalesce(Subquery(relevance), 0, output_field=IntegerField())
+        )
+
+
+class FulltextBackend:
+    """
+    FULLTEXT-индекс MySQL/MariaDB по документу товара.
+    """
+
+    def index(self, products: List[Product]) -> None:
+        documents = [
+            ProductSearchDocument(
+                product=product, document=search_document(product_fields(product))
+            )
+            for product in products
+        ]
+        with transaction.atomic():
+            ProductSearchDocument.objects.filter(product__in=products).delete()
+            ProductSearchDocument.objects.bulk_create(documents, batch_size=1000)
+
+    def search(self, queryset, tokens: List[str]):
+        query = " ".join(f"+{token}" for token in tokens) + "*"
+        table = ProductSearchDocument._meta.db_table
+        relevance = RawSQL(
+            f"MATCH({table}.document) AGAINST (%s IN BOOLEAN MODE)", [query]
+        )
+        return (
+            queryset.filter(search_document__isnull=False)
+            .annotate(relevance=relevance)
+            .filter(relevance__gt=0)
+        )
+
+
+def get_backend():
+    if connection.vendor == "mysql":
+        return FulltextBackend()
+    return InvertedIndexBackend()
+
+
+def index_products(
+    product_ids: Optional[Iterable[int]] = None, batch_size: int = 500
+) -> int:
+    """
+    Перестраивает поисковый индекс указанных (или всех) товаров.
+    """
+    backend = get_backend()
+    queryset = (
+        Product.objects.select_related("category")
+        .prefetch_related("tags")
+        .order_by("id")
+    )
+    if product_ids is not None:
+        queryset = queryset.filter(id__in=list(product_ids))
+    indexed = 0
+    batch: List[Product] = []
+    for product in queryset.iterator(chunk_size=batch_size):
+        batch.append(product)
+        if len(batch) >= batch_size:
+            backend.index(batch)
+            indexed += len(batch)
+            batch = []
+    if batch:
+        backend.index(batch)
+        indexed += len(batch)
+    return indexed
+
+
+def search_products(queryset, query: str):
+    """
+    Фильтрует товары по поисковому запросу и добавляет аннотацию relevance.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.none()
+    return get_backend().search(queryset, tokens)
@@ -0,0 +1,272 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from django.db import transaction
+from django.utils import timezone
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from tags.models import Tag
+from order.models import Order
+from catalog.models import Category
+from basket.models import Basket, BasketItem
+from userprofile.models import ProfileAvatar, UserProfile
+from product.search import index_products
+from product.ratings import rebuild_ratings
+from product.popularity import rebuild_popularity
+from product.pricing import refresh_effective_prices
+from product.models import Product, ProductImage, Review, Sale
+
+SEED_PREFIX = "seed-"
+WORDS = (
+    "smart phone laptop tablet watch camera lens speaker headphones keyboard "
+    "mouse monitor router charger cable drone console gamepad printer scanner "
+    "wireless portable compact pro ultra mini max lite classic premium"
+).split()
+DEFAULTS = {
+    "categories": 30,
+    "products": 1000,
+    "tags": 50,
+    "reviews": 5000,
+    "sales": 100,
+    "users": 20,
+    "baskets": 20,
+    "orders": 200,
+}
+
+
+class MarketplaceSeeder:
+    """
+    Генерирует воспроизводимый набор данных: одинаковый ``seed`` даёт
+    одинаковые названия, цены и связи. Все записи помечены префиксом
+    ``seed-`` и удаляются методом ``clear``.
+    """
+
+    def __init__(self, seed: int = 42, batch_size: int = 1000, **sizes):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.sizes = {**DEFAULTS, **{k: v for k, v in sizes.items() if v is not None}}
+        self.now = timezone.now()
+
+    def words(self, amount: int) -> str:
+        return " ".join(self.random.choice(WORDS) for _ in range(amount))
+
+    @staticmethod
+    def clear() -> None:
+        with transaction.atomic():
+            Order.objects.filter(fullName__startswith=SEED_PREFIX).delete()
+            Review.objects.filter(author__startswith=SEED_PREFIX).delete()
+            Product.objects.filter(sku__startswith=SEED_PREFIX).delete()
+            Category.objects.filter(title__startswith=SEED_PREFIX).delete()
+            Tag.objects.filter(name__startswith=SEED_PREFIX).delete()
+            ProductImage.objects.filter(alt__startswith=SEED_PREFIX).delete()
+            ProfileAvatar.objects.filter(
+                userprofile__user__username__startswith=SEED_PREFIX
+            ).delete()
+            User.objects.filter(username__startswith=SEED_PREFIX).delete()
+
+    def run(self) -> Dict[str, int]:
+        with transaction.atomic():
+            categories = self.create_categories()
+            tags = self.create_tags()
+            images = self.create_images()
+            products = self.create_products(categories)
+            self.link(Product.tags.through, "tag_id", products, tags, 4)
+            self.link(Product.images.through, "productimage_id", products, images, 3)
+            self.create_reviews(products)
+            self.create_sales(products)
+            users = self.create_users()
+            self.create_baskets(users, products)
+            self.create_orders(products)
+
+            rebuild_ratings(products, batch_size=self.batch_size)
+            rebuild_popularity(products, batch_size=self.batch_size)
+            refresh_effective_prices(products)
+            index_products(products)
+        return self.sizes
+
+    def create_categories(self) -> List[int]:
+        # Категории сохраняются по одной: save() строит путь в дереве.
+        ids = []
+        for i in range(self.sizes["categories"]):
+            parent = self.random.choice(ids) if ids and i % 3 else None
+            category = Category.objects.create(
+                title=f"{SEED_PREFIX}{self.words(2)} {i}", parent_id=parent
+            )
+            ids.append(category.id)
+        return ids
+
+    def create_tags(self) -> List[int]:
+        Tag.objects.bulk_create(
+            [Tag(name=f"{SEED_PREFIX}tag-{i}") for i in range(self.sizes["tags"])]
+        )
+        return list(
+            Tag.objects.filter(name__startswith=SEED_PREFIX).values_list(
+                "id", flat=True
+            )
+        )
+
+    def create_images(self) -> List[int]:
+        ProductImage.objects.bulk_create(
+            [
+                ProductImage(src=f"seed/product-{i}.jpg", alt=f"{SEED_PREFIX}{i}")
+                for i in range(20)
+            ]
+        )
+        return list(
+            ProductImage.objects.filter(alt__startswith=SEED_PREFIX).values_list(
+                "id", flat=True
+            )
+        )
+
+    def create_products(self, categories: List[int]) -> List[int]:
+        products = [
+            Product(
+                sku=f"{SEED_PREFIX}{i:07d}",
+                category_id=self.random.choice(categories),
+                title=self.words(3).title()[:100],
+                description=self.words(12),
+                fullDescription=self.words(40),
+                price=Decimal(self.random.randint(100, 500000)) / 100,
+                # Каждый десятый товар заканчивается: он попадает в limited.
+                count=self.random.randint(0, 200 if i % 10 else 9),
+                freeDelivery=self.random.random() < 0.3,
+            )
+            for i in range(self.sizes["products"])
+        ]
+        Product.objects.bulk_create(products, batch_size=self.batch_size)
+        return list(
+            Product.objects.filter(sku__startswith=SEED_PREFIX)
+            .order_by("sku")
+            .values_list("id", flat=True)
+        )
+
+    def link(self, through, field: str, products, targets, most: int) -> None:
+        links = [
+            through(product_id=product_id, **{field: target})
+            for product_id in products
+            for target in self.random.sample(
+                targets, self.random.randint(0, min(most, len(targets)))
+            )
+        ]
+        through.objects.bulk_create(links, batch_size=self.batch_size)
+
+    def create_reviews(self, products: List[int]) -> None:
+        reviews = [
+            Review(
+                author=f"{SEED_PREFIX}user-{i % 97}",
+                email=f"user{i % 97}@example.com",
+                text=self.words(20),
+                rate=self.random.randint(1, 5),
+            )
+            for i in range(self.sizes["reviews"])
+        ]
+        Review.objects.bulk_create(reviews, batch_size=self.batch_size)
+        review_ids = Review.objects.filter(author__startswith=SEED_PREFIX).values_list(
+            "id", flat=True
+        )
+        Product.reviews.through.objects.bulk_create(
+            [
+                Product.reviews.through(
+                    product_id=self.random.choice(products), review_id=review_id
+                )
+                for review_id in review_ids.order_by("id")
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def create_sales(self, products: List[int]) -> None:
+        prices = dict(
+            Product.objects.filter(id__in=products).values_list("id", "price")
+        )
+        sales = []
+        for i in range(self.sizes["sales"]):
+            product_id = self.random.choice(products)
+            starts = self.now + timedelta(days=self.random.randint(-30, 10))
+            sales.append(
+                Sale(
+                    product_id=product_id,
+                    salePrice=(prices[product_id] * Decimal("0.8")).quantize(
+                        Decimal("0.01")
+                    ),
+                    dateFrom=starts,
+                    dateTo=starts + timedelta(days=self.random.randint(1, 40)),
+                    title=f"{SEED_PREFIX}sale {i}",
+                )
+            )
+        Sale.objects.bulk_create(sales, batch_size=self.batch_size)
+
+    def create_users(self) -> List[User]:
+        # Без пароля и прав персонала: через сгенерированные учётные
+        # записи нельзя войти, даже если сидер запустили не на той базе.
+        User.objects.bulk_create(
+            [
+                User(username=f"{SEED_PREFIX}user-{i}", password=make_password(None))
+                for i in range(self.sizes["users"])
+            ]
+        )
+        users = list(
+            User.objects.filter(username__startswith=SEED_PREFIX).order_by("id")
+        )
+        # Как при регистрации: у профиля пустой аватар.
+        avatars = [ProfileAvatar.objects.create(src=None, alt=None) for _ in users]
+        UserProfile.objects.bulk_create(
+            [
+                UserProfile(
+                    user=user,
+                    fullName=user.username,
+                    email=f"{user.username}@example.com",
+                    avatar=avatar,
+                )
+                for user, avatar in zip(users, avatars)
+            ]
+        )
+        return users
+
+    def create_baskets(self, users: List[User], products: List[int]) -> None:
+        owners = users[: self.sizes["baskets"]]
+        Basket.objects.bulk_create([Basket(user=user) for user in owners])
+        baskets = Basket.objects.filter(user__in=owners).order_by("id")
+        BasketItem.objects.bulk_create(
+            [
+                BasketItem(
+                    basket=basket,
+                    product_id=product_id,
+                    quantity=self.random.randint(1, 3),
+                )
+                for basket in baskets
+                for product_id in self.random.sample(products, min(5, len(products)))
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def create_orders(self, products: List[int]) -> None:
+        orders = [
+            Order(
+                fullName=f"{SEED_PREFIX}customer {i}",
+                email=f"customer{i}@example.com",
+                phone="+70000000000",
+                deliveryType=self.random.choice(["ordinary", "express"]),
+                paymentType=self.random.choice(["online", "someone"]),
+                status=self.random.choice(["accepted", "processing"]),
+                city="Moscow",
+                address=f"Street {i}",
+            )
+            for i in range(self.sizes["orders"])
+        ]
+        Order.objects.bulk_create(orders, batch_size=self.batch_size)
+        order_ids = Order.objects.filter(fullName__startswith=SEED_PREFIX).values_list(
+            "id", flat=True
+        )
+        Order.products.through.objects.bulk_create(
+            [
+                Order.products.through(order_id=order_id, product_id=product_id)
+                for order_id in order_ids.order_by("id")
+                for product_id in self.random.sample(
+                    products, min(self.random.randint(1, 4), len(products))
+                )
+            ],
+            batch_size=self.batch_size,
+        )
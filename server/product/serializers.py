@@ -1,9 +1,45 @@
+import asyncio
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework import serializers
 
 from tags.serializers import TagSerializer
 from product.models import Product, Sale, ProductImage, Review
 
 
+class EagerLoadingMixin:
+    """
+    Сериализатор объявляет связи, которые он читает, а представление
+    применяет их к queryset, чтобы не делать запрос на каждый объект.
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, prefix: str = ""):
+        if cls.select_related_fields:
+            queryset = queryset.select_related(
+                *(prefix + field for field in cls.select_related_fields)
+            )
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(
+                *(prefix + field for field in cls.prefetch_related_fields)
+            )
+        return queryset
+
+    def get_related(self, obj, name: str):
+        """
+        Объекты связи ``name``: из ``context["related"]``, если представление
+        загрузило их заранее (так делают async-представления), иначе из prefetch.
+        """
+        related = self.context.get("related", {})
+        if name in related:
+            return related[name]
+        return getattr(obj, name).all()
+
+
 class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -22,11 +58,13 @@ class ProductImageSerializers(serializers.ModelSerializer):
         fields = ["src", "alt"]
 
 
-class ProductShortSerializers(serializers.ModelSerializer):
+class ProductShortSerializers(EagerLoadingMixin, serializers.ModelSerializer):
+    prefetch_related_fields = ("images", "tags")
+
     images = serializers.SerializerMethodField(method_name="get_product_images")
     tags = serializers.SerializerMethodField(method_name="get_tags")
     reviews = serializers.IntegerField(source="reviews_count", read_only=True)
-    rating = serializers.FloatField(source="average_rating", read_only=True)
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Product
@@ -51,18 +89,142 @@ class ProductShortSerializers(serializers.ModelSerializer):
     def get_product_images(self, obj):
         return [ProductImageSerializers(image).data for image in obj.images.all()]
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        if representation.get("rating") is None:
-            representation["rating"] = 0.0
-        return representation
+
+def card_images_query(product_ids: Iterable[int]):
+    return (
+        Product.images.through.objects.filter(product_id__in=product_ids)
+        .order_by("productimage_id")
+        .values_list("product_id", "productimage__src", "productimage__alt")
+    )
+
+
+def card_image(src: str, alt: str) -> dict:
+    storage = ProductImage._meta.get_field("src").storage
+    return {"src": storage.url(src) if src else None, "alt": alt}
+
+
+def card_tags_query(product_ids: Iterable[int]):
+    return (
+        Product.tags.through.objects.filter(product_id__in=product_ids)
+        .order_by("tag_id")
+        .values_list("product_id", "tag_id", "tag__name")
+    )
+
+
+def card_tag(tag_id: int, name: str) -> dict:
+    return {"id": tag_id, "name": name}
+
+
+def group_by_product(rows: Iterable[tuple], build: Callable) -> Dict[int, List]:
+    grouped: Dict[int, List] = {}
+    for product_id, *values in rows:
+        grouped.setdefault(product_id, []).append(build(*values))
+    return grouped
 
 
-class ProductFullSerializers(serializers.ModelSerializer):
+class ProductCardSerializer:
+    """
+    Быстрый сериализатор карточек товара для списков: тот же JSON, что у
+    ProductShortSerializers, но из строк ``values()`` и заранее
+    сгруппированных изображений и тегов, без создания моделей и вложенных
+    сериализаторов на каждую запись.
+
+    Поля, их порядок и преобразования один раз берутся из ``reference``,
+    поэтому вывод не расходится с эталонным сериализатором.
+    Представление выбирает его через ``serializer_class``.
+    """
+
+    reference = ProductShortSerializers
+    # Поле -> (запрос строк (product_id, ...) по id товаров, сборка элемента).
+    related_loaders = {
+        "images": (card_images_query, card_image),
+        "tags": (card_tags_query, card_tag),
+    }
+    _columns = None
+
+    def __init__(self, instance=None, many: bool = False, **kwargs):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def get_columns(cls) -> List[Tuple[str, str, Callable]]:
+        """
+        Список (имя в ответе, колонка values(), преобразование). У полей
+        связей вместо колонки None: значение берётся из ``related_loaders``.
+        """
+        if cls._columns is None:
+            columns = []
+            for name, field in cls.reference().fields.items():
+                if isinstance(field, serializers.SerializerMethodField):
+                    if name not in cls.related_loaders:
+                        raise ImproperlyConfigured(
+                            f"{cls.__name__} has no loader for field {name!r}."
+                        )
+                    columns.append((name, None, None))
+                elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                    # values() уже возвращает первичный ключ связи.
+                    columns.append((name, field.source, None))
+                else:
+                    columns.append((name, field.source, field.to_representation))
+            cls._columns = columns
+        return cls._columns
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.values(
+            *(source for _, source, _ in cls.get_columns() if source is not None)
+        )
+
+    @property
+    def data(self):
+        rows = list(self.instance) if self.many else [self.instance]
+        ids = [row["id"] for row in rows]
+        related = {
+            name: group_by_product(query(ids), build)
+            for name, (query, build) in self.related_loaders.items()
+        }
+        return self.build(rows, related)
+
+    async def adata(self):
+        """
+        Асинхронный вариант ``data``: связи загружаются одновременно.
+        Строки товаров должны быть уже загружены (например, страница).
+        """
+        rows = list(self.instance) if self.many else [self.instance]
+        ids = [row["id"] for row in rows]
+
+        async def load(query, build):
+            return group_by_product([row async for row in query(ids)], build)
+
+        groups = await asyncio.gather(
+            *(load(query, build) for query, build in self.related_loaders.values())
+        )
+        return self.build(rows, dict(zip(self.related_loaders, groups)))
+
+    def build(self, rows: List[dict], related: Dict[str, Dict[int, List]]):
+        columns = self.get_columns()
+        items = []
+        for row in rows:
+            item = {}
+            for name, source, convert in columns:
+                if source is None:
+                    item[name] = related[name].get(row["id"], [])
+                    continue
+                value = row[source]
+                item[name] = (
+                    value if value is None or convert is None else convert(value)
+                )
+            items.append(item)
+        return items if self.many else items[0]
+
+
+class ProductFullSerializers(EagerLoadingMixin, serializers.ModelSerializer):
+    prefetch_related_fields = ("images", "tags", "reviews")
+
     images = serializers.SerializerMethodField(method_name="get_product_images")
     tags = serializers.SerializerMethodField(method_name="get_tags")
     reviews = serializers.SerializerMethodField(method_name="get_reviews")
-    rating = serializers.FloatField(source="average_rating", read_only=True)
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Product
@@ -84,16 +246,21 @@ class ProductFullSerializers(serializers.ModelSerializer):
         ]
 
     def get_product_images(self, obj):
-        return [ProductImageSerializers(image).data for image in obj.images.all()]
+        images = self.get_related(obj, "images")
+        return [ProductImageSerializers(image).data for image in images]
 
     def get_tags(self, obj):
-        return [tag.name for tag in obj.tags.all()]
+        return [tag.name for tag in self.get_related(obj, "tags")]
 
     def get_reviews(self, obj):
-        return [ReviewSerializer(review).data for review in obj.reviews.all()]
+        reviews = self.get_related(obj, "reviews")
+        return [ReviewSerializer(review).data for review in reviews]
+
 
+class SaleSerializers(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ("product",)
+    prefetch_related_fields = ("product__images",)
 
-class SaleSerializers(serializers.ModelSerializer):
     images = serializers.SerializerMethodField()
     price = serializers.SerializerMethodField()
 
@@ -110,7 +277,7 @@ class SaleSerializers(serializers.ModelSerializer):
         ]
 
     def get_images(self, obj):
-        return [image.src for image in obj.product.images.all()]
+        return [image.src.url for image in obj.product.images.all()]
 
     def get_price(self, obj):
         return obj.product.price
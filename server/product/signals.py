@@ -0,0 +1,176 @@
+from django.db.models import Sum
+from django.dispatch import receiver
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from tags.models import Tag
+from catalog.models import Category
+from product.search import index_products
+from product.models import Product, ProductImage, Review, Sale
+from product.pricing import refresh_effective_prices
+from product.ratings import apply_review_delta, rebuild_ratings
+
+
+def _review_product_ids(review: Review):
+    return list(Product.objects.filter(reviews=review).values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=Product.reviews.through)
+def update_rating_on_reviews_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Поддерживает счётчики отзывов при изменении связи товар–отзыв.
+    """
+    if action == "post_add" and pk_set:
+        if reverse:
+            apply_review_delta(pk_set, 1, instance.rate)
+        else:
+            rate_sum = Review.objects.filter(id__in=pk_set).aggregate(
+                total=Sum("rate")
+            )["total"]
+            apply_review_delta([instance.pk], len(pk_set), rate_sum or 0)
+    elif action in ("pre_remove", "pre_clear") and reverse:
+        instance._rating_product_ids = _review_product_ids(instance)
+    elif action in ("post_remove", "post_clear"):
+        if reverse:
+            rebuild_ratings(getattr(instance, "_rating_product_ids", []))
+        else:
+            rebuild_ratings([instance.pk])
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_saved(sender, instance, created, **kwargs):
+    """
+    Пересчитывает рейтинг товаров при изменении оценки отзыва.
+    """
+    if not created:
+        rebuild_ratings(_review_product_ids(instance))
+
+
+@receiver(pre_delete, sender=Review)
+def remember_review_products(sender, instance, **kwargs):
+    instance._rating_product_ids = _review_product_ids(instance)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_deleted(sender, instance, **kwargs):
+    rebuild_ratings(getattr(instance, "_rating_product_ids", []))
+
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, **kwargs):
+    index_products([instance.pk])
+
+
+@receiver(m2m_changed, sender=Product.tags.through)
+def index_products_on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Переиндексирует товары при изменении их тегов.
+    """
+    if action in ("pre_remove", "pre_clear") and reverse:
+        instance._search_product_ids = list(
+            instance.product_set.values_list("id", flat=True)
+        )
+    elif action in ("post_add", "post_remove", "post_clear"):
+        if not reverse:
+            index_products([instance.pk])
+        elif action == "post_add":
+            index_products(pk_set)
+        else:
+            index_products(getattr(instance, "_search_product_ids", []))
+
+
+@receiver(post_save, sender=Tag)
+def index_products_on_tag_saved(sender, instance, created, **kwargs):
+    if not created:
+        index_products(instance.product_set.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Category)
+def index_products_on_category_saved(sender, instance, created, **kwargs):
+    if not created:
+        index_products(instance.products.values_list("id", flat=True))
+
+
+PRODUCT_RELATIONS = {Review: "reviews", Tag: "tags", ProductImage: "images"}
+
+
+def _linked_product_ids(instance):
+    field = PRODUCT_RELATIONS[type(instance)]
+    return list(
+        Product.objects.filter(**{field: instance}).values_list("id", flat=True)
+    )
+
+
+def touch_products(product_ids):
+    product_ids = list(product_ids)
+    if product_ids:
+        Product.objects.filter(id__in=product_ids).touch()
+
+
+@receiver(post_save, sender=Product)
+def touch_saved_product(sender, instance, **kwargs):
+    touch_products([instance.pk])
+
+
+@receiver(m2m_changed, sender=Product.images.through)
+@receiver(m2m_changed, sender=Product.tags.through)
+@receiver(m2m_changed, sender=Product.reviews.through)
+def touch_products_on_relations_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Обновляет версию товаров при изменении их изображений, тегов и отзывов.
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            touch_products([instance.pk])
+    elif action == "pre_clear":
+        instance._touched_product_ids = _linked_product_ids(instance)
+    elif action in ("post_add", "post_remove"):
+        touch_products(pk_set)
+    elif action == "post_clear":
+        touch_products(getattr(instance, "_touched_product_ids", []))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=ProductImage)
+def touch_products_on_related_saved(sender, instance, created, **kwargs):
+    if not created:
+        touch_products(_linked_product_ids(instance))
+
+
+@receiver(pre_delete, sender=Review)
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=ProductImage)
+def remember_linked_products(sender, instance, **kwargs):
+    instance._touched_product_ids = _linked_product_ids(instance)
+
+
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=ProductImage)
+def touch_products_on_related_deleted(sender, instance, **kwargs):
+    touch_products(getattr(instance, "_touched_product_ids", []))
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+def touch_product_on_sale_changed(sender, instance, **kwargs):
+    touch_products([instance.product_id])
+
+
+@receiver(post_save, sender=Product)
+def update_effective_price_on_product_saved(sender, instance, **kwargs):
+    refresh_effective_prices([instance.pk])
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+def update_effective_price_on_sale_changed(sender, instance, **kwargs):
+    """
+    Пересчитывает цену товара при изменении его скидок. Наступление
+    границ действия скидок обрабатывает команда run_sale_scheduler.
+    """
+    refresh_effective_prices([instance.product_id])
@@ -1,11 +1,30 @@
+import os
+import json
+import tempfile
+from io import StringIO
+from datetime import timedelta
+
 from django.urls import reverse
-from django.test import TestCase
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.core.cache import cache
 from rest_framework import status
+from asgiref.sync import async_to_sync
+from rest_framework.test import APIRequestFactory
+from rest_framework.renderers import JSONRenderer
+from django.core.management import CommandError, call_command
 from django.contrib.auth.models import User
 from django.core.files.base import ContentFile
 
 from catalog.models import CategoryImage
+from catalog.cache import RESPONSE_CACHE_NAMESPACE, get_generation
 from product.models import Product, Category, ProductImage, Tag, Review
+from product.models import ProductSearchTerm, Sale
+from product.pricing import apply_sale_boundaries
+from product.views import AsyncProductDetailsAPIView
+from product.serializers import ProductCardSerializer, ProductShortSerializers
+from product.benchmark import check_budgets, check_scaling, load_budgets, run_scaling
 
 
 class ProductDetailsAPITest(TestCase):
@@ -91,6 +110,99 @@ class ProductDetailsAPITest(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_conditional_get_not_modified(self):
+        """
+        Тестирование ответа 304 по ETag без загрузки товара.
+        """
+        url = reverse("product-details", args=[self.product.id])
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+    def test_if_modified_since_within_same_second(self):
+        """
+        Тестирование If-Modified-Since при нескольких правках за секунду.
+        """
+        moment = timezone.now().replace(microsecond=0)
+        Product.objects.filter(id=self.product.id).update(updated_at=moment)
+        url = reverse("product-details", args=[self.product.id])
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Product.objects.filter(id=self.product.id).update(
+            updated_at=moment + timedelta(microseconds=500), version=F("version") + 1
+        )
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Last-Modified"], last_modified)
+
+    def test_etag_changes_on_save_after_touch(self):
+        """
+        Тестирование сохранения товара, загруженного до смены версии.
+        """
+        product = Product.objects.get(id=self.product.id)
+        product.tags.add(Tag.objects.create(name="New"))
+        url = reverse("product-details", args=[self.product.id])
+        etag = self.client.get(url)["ETag"]
+
+        product.title = "Renamed"
+        product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "Renamed")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_changes_on_related_update(self):
+        """
+        Тестирование смены ETag при изменении тегов, отзывов и скидок.
+        """
+        url = reverse("product-details", args=[self.product.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.product.tags.add(Tag.objects.create(name="New"))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        review = Review.objects.get(id=self.review.id)
+        review.rate = 3
+        review.save()
+        self.assertNotEqual(self.client.get(url)["ETag"], etag)
+
+    def get_async_details(self, product_id, **headers):
+        request = APIRequestFactory().get("/", **headers)
+        response = async_to_sync(AsyncProductDetailsAPIView.as_view())(
+            request, id=product_id
+        )
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def test_async_view(self):
+        """
+        Тестирование асинхронного варианта: тот же ответ и заголовки.
+        """
+        expected = self.client.get(reverse("product-details", args=[self.product.id]))
+        response = self.get_async_details(self.product.id)
+        self.assertEqual(json.loads(response.content), expected.json())
+        self.assertEqual(response["ETag"], expected["ETag"])
+        self.assertEqual(response["Last-Modified"], expected["Last-Modified"])
+
+        not_modified = self.get_async_details(
+            self.product.id, HTTP_IF_NONE_MATCH=expected["ETag"]
+        )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(
+            self.get_async_details(999).status_code, status.HTTP_404_NOT_FOUND
+        )
+
 
 class ProductReviewAPITest(TestCase):
     def setUp(self):
@@ -164,3 +276,478 @@ class ProductReviewAPITest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(Review.objects.count(), 0)
+
+
+class ProductRatingCountersTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(title="Electronics")
+        self.product = Product.objects.create(
+            category=self.category,
+            price=100,
+            count=5,
+            title="Keyboard",
+        )
+        self.payload = {
+            "author": "Test Author",
+            "email": "author@example.com",
+            "text": "Nice keyboard.",
+            "rate": 4,
+        }
+
+    def create_review(self, rate):
+        review = Review.objects.create(
+            author="author", email="author@example.com", text="text", rate=rate
+        )
+        self.product.reviews.add(review)
+        return review
+
+    def test_review_endpoint_updates_counters(self):
+        """
+        Тестирование обновления счётчиков при создании отзыва через API.
+        """
+        url = reverse("product-review", args=[self.product.id])
+        self.client.post(url, data=self.payload, format="json")
+        self.client.post(url, data={**self.payload, "rate": 5}, format="json")
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reviews_count, 2)
+        self.assertEqual(self.product.rating_sum, 9)
+        self.assertEqual(self.product.rating, 4.5)
+
+    def test_save_keeps_denormalized_fields(self):
+        """
+        Тестирование сохранения товара, загруженного до обновления счётчиков.
+        """
+        self.create_review(rate=4)
+        Product.objects.filter(id=self.product.id).update(
+            orders_count=3, popularity=7.5, effective_price=80
+        )
+        self.product.title = "Mechanical keyboard"
+        self.product.save()
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.title, "Mechanical keyboard")
+        self.assertEqual(self.product.reviews_count, 1)
+        self.assertEqual(self.product.rating, 4.0)
+        self.assertEqual(self.product.orders_count, 3)
+        self.assertEqual(self.product.popularity, 7.5)
+
+        self.product.rating = 1.0
+        self.product.save(update_fields=["rating"])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating, 1.0)
+
+    def test_review_rate_change_updates_rating(self):
+        """
+        Тестирование пересчёта рейтинга при изменении оценки отзыва.
+        """
+        review = self.create_review(rate=2)
+        self.create_review(rate=4)
+        review.rate = 5
+        review.save()
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reviews_count, 2)
+        self.assertEqual(self.product.rating, 4.5)
+
+    def test_review_delete_updates_counters(self):
+        """
+        Тестирование пересчёта счётчиков при удалении и отвязке отзывов.
+        """
+        review = self.create_review(rate=2)
+        other_review = self.create_review(rate=4)
+        review.delete()
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reviews_count, 1)
+        self.assertEqual(self.product.rating, 4.0)
+
+        self.product.reviews.remove(other_review)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reviews_count, 0)
+        self.assertEqual(self.product.rating, 0.0)
+
+    def test_rebuild_ratings_command(self):
+        """
+        Тестирование команды полного пересчёта рейтингов.
+        """
+        self.create_review(rate=3)
+        self.create_review(rate=5)
+        Product.objects.update(reviews_count=0, rating_sum=0, rating=0.0)
+        generation = get_generation(RESPONSE_CACHE_NAMESPACE)
+
+        call_command("rebuild_ratings", stdout=StringIO())
+
+        # update() не вызывает сигналы: кэш ответов сбрасывает команда.
+        self.assertNotEqual(get_generation(RESPONSE_CACHE_NAMESPACE), generation)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reviews_count, 2)
+        self.assertEqual(self.product.rating_sum, 8)
+        self.assertEqual(self.product.rating, 4.0)
+
+
+class ProductSearchIndexTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(title="Electronics")
+        self.product = Product.objects.create(
+            category=self.category,
+            price=100,
+            title="Mechanical Keyboard",
+            description="Hot-swap switches",
+        )
+        self.product.tags.add(Tag.objects.create(name="Gaming"))
+
+    def test_index_on_save(self):
+        """
+        Тестирование построения индекса при сохранении товара.
+        """
+        terms = dict(
+            ProductSearchTerm.objects.filter(product=self.product).values_list(
+                "term", "weight"
+            )
+        )
+        self.assertEqual(terms["keyboard"], 3)
+        self.assertEqual(terms["gaming"], 2)
+        self.assertEqual(terms["electronics"], 2)
+        self.assertEqual(terms["switches"], 1)
+
+    def test_rebuild_search_index_command(self):
+        """
+        Тестирование команды полного перестроения поискового индекса.
+        """
+        ProductSearchTerm.objects.all().delete()
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertTrue(
+            ProductSearchTerm.objects.filter(
+                product=self.product, term="mechanical"
+            ).exists()
+        )
+
+
+class ProductEffectivePriceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(title="Electronics")
+        self.product = Product.objects.create(
+            category=self.category, price=100, title="Keyboard"
+        )
+        self.now = timezone.now()
+
+    def create_sale(self, price, starts, ends):
+        return Sale.objects.create(
+            product=self.product,
+            salePrice=price,
+            dateFrom=self.now + timedelta(days=starts),
+            dateTo=self.now + timedelta(days=ends),
+            title="Sale",
+        )
+
+    def test_active_sale_applied_on_write(self):
+        """
+        Тестирование пересчёта цены при изменении товара и скидок.
+        """
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, 100)
+
+        sale = self.create_sale(80, -1, 1)
+        self.create_sale(90, -1, 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, 80)
+
+        sale.delete()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, 90)
+
+    def test_scheduler_applies_and_reverts_at_boundaries(self):
+        """
+        Тестирование применения и отмены скидки на границах действия.
+        """
+        self.create_sale(70, 1, 2)
+        self.assertEqual(apply_sale_boundaries(self.now), [])
+
+        changed = apply_sale_boundaries(self.now + timedelta(days=1, hours=1))
+        self.assertEqual(changed, [self.product.id])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, 70)
+
+        apply_sale_boundaries(self.now + timedelta(days=3))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, 100)
+
+    def test_scheduler_command(self):
+        """
+        Тестирование однократного запуска планировщика скидок.
+        """
+        Product.objects.update(effective_price=1)
+        out = StringIO()
+        call_command("run_sale_scheduler", "--once", stdout=out)
+        self.assertIn("Обновлено цен: 1", out.getvalue())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, 100)
+
+
+class ImportProductsCommandTest(TestCase):
+    CSV_FEED = (
+        "sku,title,category,price,count,freeDelivery,tags,images\n"
+        "A-1,Keyboard,Peripherals,100,5,true,Gaming|Office,products/a1.jpg\n"
+        "A-2,Mouse,Peripherals,50.5,0,false,Gaming,\n"
+    )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_feed(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as feed:
+            feed.write(content)
+        return path
+
+    def import_feed(self, path: str, *args) -> str:
+        out = StringIO()
+        call_command("import_products", path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_csv(self):
+        """
+        Тестирование загрузки товаров, категорий, тегов и изображений.
+        """
+        out = self.import_feed(self.write_feed("feed.csv", self.CSV_FEED))
+        self.assertIn("создано: 2", out)
+
+        keyboard = Product.objects.get(sku="A-1")
+        self.assertEqual(keyboard.category.title, "Peripherals")
+        self.assertEqual(keyboard.effective_price, 100)
+        self.assertTrue(keyboard.freeDelivery)
+        self.assertEqual(
+            sorted(keyboard.tags.values_list("name", flat=True)), ["Gaming", "Office"]
+        )
+        self.assertEqual(keyboard.images.get().src.name, "products/a1.jpg")
+        self.assertTrue(keyboard.search_terms.filter(term="keyboard").exists())
+        self.assertEqual(Tag.objects.filter(name="Gaming").count(), 1)
+
+    def test_reimport_is_idempotent(self):
+        """
+        Тестирование повторной загрузки: меняются только изменённые товары.
+        """
+        path = self.write_feed("feed.csv", self.CSV_FEED)
+        self.import_feed(path, "--batch-size", "1")
+        versions = dict(Product.objects.values_list("sku", "version"))
+
+        out = self.import_feed(path)
+        self.assertIn("без изменений: 2", out)
+        self.assertEqual(dict(Product.objects.values_list("sku", "version")), versions)
+
+        changed = self.CSV_FEED.replace(
+            "Mouse,Peripherals,50.5", "Mouse,Peripherals,45"
+        )
+        out = self.import_feed(self.write_feed("feed.csv", changed))
+        self.assertIn("обновлено: 1", out)
+        self.assertEqual(Product.objects.get(sku="A-2").price, 45)
+        self.assertEqual(Product.objects.get(sku="A-1").version, versions["A-1"])
+
+    def test_import_ndjson_updates_relations(self):
+        """
+        Тестирование загрузки NDJSON и замены тегов товара.
+        """
+        self.import_feed(self.write_feed("feed.csv", self.CSV_FEED))
+        row = {
+            "sku": "A-1",
+            "title": "Keyboard",
+            "category": "Peripherals",
+            "price": "100.00",
+            "count": 5,
+            "freeDelivery": True,
+            "tags": ["Office"],
+        }
+        out = self.import_feed(self.write_feed("feed.ndjson", json.dumps(row) + "\n"))
+        self.assertIn("обновлено: 1", out)
+
+        keyboard = Product.objects.get(sku="A-1")
+        self.assertEqual(list(keyboard.tags.values_list("name", flat=True)), ["Office"])
+        self.assertEqual(keyboard.images.count(), 1)
+
+    def test_invalid_row(self):
+        """
+        Тестирование ошибки в строке фида.
+        """
+        path = self.write_feed("feed.csv", "sku,title,category,price\nA-1,,Misc,1\n")
+        with self.assertRaisesMessage(CommandError, "line 1: title is required"):
+            self.import_feed(path)
+
+    def test_malformed_rows(self):
+        """
+        Тестирование строк, которые нельзя разобрать: ошибка с номером строки.
+        """
+        valid = json.dumps({"sku": "A-1", "title": "Keyboard", "category": "Misc"})
+        for row, message in (
+            ("{broken", "line 2: invalid JSON"),
+            ("[1, 2]", "line 2: row must be an object"),
+            (
+                '{"sku": "A-2", "title": "T", "category": "M", "price": "NaN"}',
+                "numbers",
+            ),
+            ('{"sku": "A-2", "title": "T", "category": "M", "price": 1e30}', "exceed"),
+            (
+                '{"sku": "A-2", "title": "T", "category": "M", "price": 1, "tags": 5}',
+                "tags",
+            ),
+        ):
+            with self.subTest(row=row):
+                feed = valid.replace("}", ', "price": 1}') + "\n" + row + "\n"
+                path = self.write_feed("feed.ndjson", feed)
+                with self.assertRaisesMessage(CommandError, message):
+                    self.import_feed(path)
+
+    def test_failed_import_invalidates_committed_batches(self):
+        """
+        Тестирование сброса кэша после пачек, зафиксированных до ошибки.
+        """
+        feed = self.CSV_FEED + "A-3,,Peripherals,1,1,false,,\n"
+        generation = get_generation(RESPONSE_CACHE_NAMESPACE)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaisesMessage(CommandError, "line 3"):
+                self.import_feed(self.write_feed("feed.csv", feed), "--batch-size", "2")
+
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertNotEqual(get_generation(RESPONSE_CACHE_NAMESPACE), generation)
+
+
+class BenchmarkCommandsTest(TestCase):
+    SIZES = (
+        "--products=30",
+        "--categories=4",
+        "--tags=5",
+        "--reviews=40",
+        "--sales=5",
+        "--users=2",
+        "--baskets=1",
+        "--orders=5",
+    )
+
+    def seed(self, *args) -> None:
+        call_command("seed_marketplace", *self.SIZES, *args, stdout=StringIO())
+
+    def snapshot(self) -> list:
+        return list(
+            Product.objects.order_by("sku").values_list(
+                "sku", "title", "price", "effective_price", "rating"
+            )
+        )
+
+    def test_seed_is_reproducible(self):
+        """
+        Тестирование генератора: одинаковый seed даёт одинаковые данные.
+        """
+        self.seed()
+        first = self.snapshot()
+        self.assertEqual(len(first), 30)
+
+        with self.assertRaises(CommandError):
+            self.seed()
+
+        self.seed("--clear")
+        self.assertEqual(self.snapshot(), first)
+
+    def test_seeded_users_cannot_sign_in(self):
+        """
+        Тестирование генератора: у пользователей нет пароля и прав персонала.
+        """
+        self.seed()
+        users = User.objects.filter(username__startswith="seed-")
+        self.assertEqual(users.count(), 2)
+        for user in users:
+            self.assertFalse(user.has_usable_password())
+            self.assertFalse(user.is_staff)
+
+    @override_settings(ALLOWED_HOSTS=["localhost"])
+    def test_benchmark_covers_api_routes(self):
+        """
+        Тестирование отчёта бенчмарка: все маршруты API покрыты или пропущены явно.
+        """
+        self.seed()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.json")
+            call_command(
+                "benchmark_endpoints",
+                "--iterations=1",
+                f"--output={path}",
+                stdout=StringIO(),
+            )
+            with open(path, encoding="utf-8") as output:
+                report = json.load(output)
+
+        self.assertEqual(report["uncovered"], [])
+        self.assertEqual(report["dataset"]["products"], 30)
+        # Вход и выгрузка для персонала готовятся внутри замера.
+        self.assertEqual(report["endpoints"]["POST /api/sign-in/"]["status"], [200])
+        self.assertEqual(
+            report["endpoints"]["GET /api/catalog/export/"]["status"], [200]
+        )
+        for result in report["endpoints"].values():
+            self.assertLess(max(result["status"]), 500)
+            self.assertIn("queries_cold", result)
+
+
+class ProductCardSerializerTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(title="Electronics")
+        self.product = Product.objects.create(
+            category=self.category,
+            price=500.67,
+            count=12,
+            title="Video Card",
+            description="Description of the product",
+            freeDelivery=True,
+            rating=4.5,
+            reviews_count=2,
+        )
+        self.bare = Product.objects.create(
+            category=self.category, price=10, count=0, title="Cable"
+        )
+        self.product.images.add(
+            ProductImage.objects.create(src="/media/images/image1.jpg", alt="One"),
+            ProductImage.objects.create(src="", alt="Empty"),
+        )
+        self.product.tags.add(
+            Tag.objects.create(name="Gaming"), Tag.objects.create(name="Graphics")
+        )
+
+    def test_parity_with_model_serializer(self):
+        """
+        Тестирование совпадения JSON быстрого и эталонного сериализаторов.
+        """
+        queryset = Product.objects.order_by("id")
+        expected = ProductShortSerializers(
+            ProductShortSerializers.setup_eager_loading(queryset), many=True
+        ).data
+        rows = ProductCardSerializer.setup_eager_loading(queryset)
+        with self.assertNumQueries(3):
+            data = ProductCardSerializer(rows, many=True).data
+
+        self.assertEqual(data, expected)
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+        self.assertEqual(data[1]["images"], [])
+
+        single = ProductCardSerializer(rows.get(id=self.product.id)).data
+        self.assertEqual(single, expected[0])
+
+
+class QueryBudgetTest(TestCase):
+    # Клиент бенчмарка обращается к localhost; иначе все ответы были бы 400.
+    @override_settings(ALLOWED_HOSTS=["localhost"])
+    def test_query_budgets(self):
+        """
+        Тестирование числа запросов: оно не растёт с объёмом данных
+        и не превышает бюджет из product/query_budgets.json.
+        """
+        reports = run_scaling(iterations=2)
+        self.assertEqual(reports["large"]["uncovered"], [])
+        self.assertEqual(check_scaling(reports["small"], reports["large"]), [])
+        self.assertEqual(check_budgets(reports["large"], load_budgets()), [])
+        for name, result in reports["large"]["endpoints"].items():
+            self.assertLess(max(result["status"]), 400, name)
+        self.assertFalse(Product.objects.exists())
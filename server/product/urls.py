@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.urls import path
 
+from product.views import AsyncProductDetailsAPIView
 from product.views import ProductDetailsAPIView, ProductReviewAPIVIew
 
+if settings.ASYNC_API_VIEWS:
+    details_view = AsyncProductDetailsAPIView
+else:
+    details_view = ProductDetailsAPIView
+
 
 urlpatterns = [
-    path("product/<int:id>/", ProductDetailsAPIView.as_view(), name="product-details"),
+    path("product/<int:id>/", details_view.as_view(), name="product-details"),
     path(
         "product/<int:id>/reviews/",
         ProductReviewAPIVIew.as_view(),
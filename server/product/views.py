@@ -1,4 +1,11 @@
-from django.db.models import Avg
+import math
+import asyncio
+from calendar import timegm
+
+from django.db import transaction
+from django.http import Http404
+from django.utils.http import http_date
+from django.utils.cache import get_conditional_response
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.request import Request
@@ -6,21 +13,89 @@ from rest_framework.response import Response
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 
-from product.models import Product
+from tags.models import Tag
+from server.async_views import AsyncAPIView, alist
+from product.models import Product, ProductImage, Review
 from product.serializers import ProductFullSerializers, ReviewSerializer
 
 
 class ProductDetailsAPIView(APIView):
     """
     Получение полной информации о продукте.
+    Поддерживает условные запросы по ETag и Last-Modified:
+    версия товара проверяется до загрузки и сериализации.
     """
 
     def get(self, request: Request, id: int) -> Response:
+        stamp = Product.objects.filter(id=id).values_list("version", "updated_at")
+        version, updated_at = get_object_or_404(stamp)
+        headers = self.get_stamp_headers(id, version, updated_at)
+        not_modified = self.get_not_modified(request, headers, updated_at)
+        if not_modified is not None:
+            return not_modified
+
         product = get_object_or_404(
-            Product.objects.annotate(rating=Avg("reviews__rate")), id=id
+            ProductFullSerializers.setup_eager_loading(Product.objects.all()), id=id
         )
         serializer = ProductFullSerializers(product)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers=headers)
+
+    @staticmethod
+    def get_stamp_headers(id: int, version: int, updated_at) -> dict:
+        return {
+            "ETag": f'"product-{id}-{version}"',
+            "Last-Modified": http_date(timegm(updated_at.utctimetuple())),
+        }
+
+    @staticmethod
+    def get_not_modified(request, headers: dict, updated_at):
+        """
+        Ответ 304, если версия клиента актуальна. Last-Modified точен до
+        секунды, поэтому для сравнения с If-Modified-Since время изменения
+        округляется вверх: правка в ту же секунду не даст ложного 304.
+        """
+        not_modified = get_conditional_response(
+            request,
+            etag=headers["ETag"],
+            last_modified=math.ceil(updated_at.timestamp()),
+        )
+        if not_modified is not None:
+            for header, value in headers.items():
+                not_modified[header] = value
+        return not_modified
+
+
+class AsyncProductDetailsAPIView(AsyncAPIView, ProductDetailsAPIView):
+    """
+    Асинхронный вариант ProductDetailsAPIView для запуска под ASGI.
+    Товар, изображения, теги и отзывы загружаются через async ORM
+    одновременно. Django выполняет запросы одного запроса по очереди
+    в его потоке базы, но пока они идут, процесс обслуживает другие запросы.
+    """
+
+    async def get(self, request: Request, id: int) -> Response:
+        stamp = await (
+            Product.objects.filter(id=id).values_list("version", "updated_at").afirst()
+        )
+        if stamp is None:
+            raise Http404
+        version, updated_at = stamp
+        headers = self.get_stamp_headers(id, version, updated_at)
+        not_modified = self.get_not_modified(request, headers, updated_at)
+        if not_modified is not None:
+            return not_modified
+
+        product, images, tags, reviews = await asyncio.gather(
+            Product.objects.filter(id=id).afirst(),
+            alist(ProductImage.objects.filter(products=id)),
+            alist(Tag.objects.filter(product=id)),
+            alist(Review.objects.filter(product=id)),
+        )
+        if product is None:
+            raise Http404
+        related = {"images": images, "tags": tags, "reviews": reviews}
+        serializer = ProductFullSerializers(product, context={"related": related})
+        return Response(serializer.data, status=status.HTTP_200_OK, headers=headers)
 
 
 class ProductReviewAPIVIew(APIView):
@@ -33,7 +108,8 @@ class ProductReviewAPIVIew(APIView):
         product = get_object_or_404(Product, id=id)
         request_serializer = ReviewSerializer(data=request.data)
         if request_serializer.is_valid():
-            review = request_serializer.save()
-            product.reviews.add(review)
+            with transaction.atomic():
+                review = request_serializer.save()
+                product.reviews.add(review)
             return Response(request_serializer.data, status=status.HTTP_200_OK)
         return Response(request_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
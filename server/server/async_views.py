@@ -0,0 +1,47 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from rest_framework.views import APIView
+
+
+async def alist(queryset) -> list:
+    """
+    Загружает queryset через async ORM.
+    """
+    return [obj async for obj in queryset]
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView с асинхронным dispatch для обработчиков ``async def``.
+
+    Аутентификация, проверка прав и согласование формата (``initial``)
+    обращаются к сессии в базе синхронно, поэтому выполняются в потоке
+    через sync_to_async. Синхронные обработчики (например ``options``)
+    вызываются так же.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,200 @@
+from itertools import count
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.decorators import sync_and_async_middleware
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
+PIN_COOKIE = "db_primary"
+LAG_CACHE_KEY = "db:replica-lag:{alias}"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Таблица DatabaseCache: запись в кэш не закрепляет клиента за основной базой.
+CACHE_APP_LABEL = "django_cache"
+
+# Реплика, выбранная для запроса один раз: все его чтения видят одно
+# и то же состояние данных. ``None`` — читать с основной базы.
+replica_alias: ContextVar[Optional[str]] = ContextVar("replica_alias", default=None)
+# В текущем запросе уже была запись: дальше читаем с основной базы.
+primary_written: ContextVar[bool] = ContextVar("primary_written", default=False)
+
+_rotation = count()
+
+
+@contextmanager
+def primary_reads():
+    """
+    Чтения внутри блока идут в основную базу. Так заполняются общие кэши:
+    данные отстающей реплики остались бы в них и после сброса поколения.
+    """
+    token = replica_alias.set(None)
+    try:
+        yield
+    finally:
+        replica_alias.reset(token)
+
+
+def stream_from_replica(iterable: Iterable) -> Iterator:
+    """
+    Потоковый ответ читается уже после ReplicaMiddleware, когда выбор
+    реплики сброшен. Обёртка восстанавливает состояние маршрутизации
+    запроса на время получения каждого элемента.
+    """
+    alias, written = replica_alias.get(), primary_written.get()
+
+    def stream():
+        iterator = iter(iterable)
+        while True:
+            tokens = replica_alias.set(alias), primary_written.set(written)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                replica_alias.reset(tokens[0])
+                primary_written.reset(tokens[1])
+            yield item
+
+    # Реплика запоминается сейчас, а не при первом next() генератора.
+    return stream()
+
+
+def replica_lag(alias: str) -> Optional[float]:
+    """
+    Отставание реплики в секундах по SHOW REPLICA STATUS (MySQL/MariaDB),
+    ``None`` если репликация остановлена или реплика недоступна.
+    Значение кэшируется на DATABASE_REPLICA_LAG_CHECK_INTERVAL секунд.
+    """
+    key = LAG_CACHE_KEY.format(alias=alias)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached["lag"]
+
+    connection = connections[alias]
+    lag = 0.0
+    try:
+        if connection.vendor == "mysql":
+            with connection.cursor() as cursor:
+                cursor.execute("SHOW REPLICA STATUS")
+                row = cursor.fetchone()
+                if row is not None:
+                    status = dict(zip((col[0] for col in cursor.description), row))
+                    lag = status.get(
+                        "Seconds_Behind_Source", status.get("Seconds_Behind_Master")
+                    )
+    except DatabaseError:
+        lag = None
+
+    cache.set(
+        key,
+        {"lag": lag},
+        getattr(settings, "DATABASE_REPLICA_LAG_CHECK_INTERVAL", 5),
+    )
+    return lag
+
+
+def choose_replica() -> Optional[str]:
+    """
+    Реплика для чтения среди отстающих не больше DATABASE_REPLICA_MAX_LAG
+    по стратегии DATABASE_REPLICA_STRATEGY: ``round_robin`` по очереди,
+    ``least_lag`` с наименьшим отставанием. ``None`` означает основную базу.
+    """
+    replicas = list(getattr(settings, "DATABASE_REPLICAS", ()))
+    if not replicas:
+        return None
+
+    # Сдвиг по кругу: при равном отставании реплики тоже чередуются.
+    shift = next(_rotation) % len(replicas)
+    replicas = replicas[shift:] + replicas[:shift]
+    max_lag = getattr(settings, "DATABASE_REPLICA_MAX_LAG", 5)
+    lags: Dict[str, float] = {}
+    for alias in replicas:
+        lag = replica_lag(alias)
+        if lag is not None and lag <= max_lag:
+            lags[alias] = lag
+    if not lags:
+        return None
+    if getattr(settings, "DATABASE_REPLICA_STRATEGY", "round_robin") != "least_lag":
+        return next(iter(lags))
+    return min(lags, key=lags.get)
+
+
+class ReplicaRouter:
+    """
+    Направляет чтение моделей из DATABASE_REPLICA_APPS на реплики, если
+    запрос помечен ReplicaMiddleware как читающий. Запись всегда идёт
+    в основную базу и до конца запроса переключает на неё и чтение.
+    """
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        alias = replica_alias.get()
+        if alias is None or primary_written.get():
+            return None
+        if model._meta.app_label not in settings.DATABASE_REPLICA_APPS:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints) -> str:
+        if model._meta.app_label != CACHE_APP_LABEL:
+            primary_written.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        # Реплики содержат те же данные, что и основная база.
+        return True
+
+
+def reads_from_replica(request) -> bool:
+    return (
+        request.method in SAFE_METHODS
+        and PIN_COOKIE not in request.COOKIES
+        and request.path.startswith(tuple(settings.DATABASE_REPLICA_PATHS))
+    )
+
+
+@sync_and_async_middleware
+def ReplicaMiddleware(get_response):
+    """
+    Выбирает реплику для GET-запросов к каталогу, одну на весь запрос.
+    После запроса с записью клиент получает cookie
+    и DATABASE_REPLICA_PIN_SECONDS читает с основной базы, чтобы видеть
+    свои изменения.
+    """
+
+    def start(request, alias):
+        return replica_alias.set(alias), primary_written.set(False)
+
+    def finish(tokens, response):
+        if primary_written.get():
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 5),
+                httponly=True,
+                samesite="Lax",
+            )
+        replica_alias.reset(tokens[0])
+        primary_written.reset(tokens[1])
+        return response
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            alias = None
+            if reads_from_replica(request):
+                # Отставание читается из кэша и базы синхронно.
+                alias = await sync_to_async(choose_replica)()
+            tokens = start(request, alias)
+            return finish(tokens, await get_response(request))
+
+    else:
+
+        def middleware(request):
+            alias = choose_replica() if reads_from_replica(request) else None
+            tokens = start(request, alias)
+            return finish(tokens, get_response(request))
+
+    return middleware
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "server.db_routing.ReplicaMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -67,6 +68,9 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "server.wsgi.application"
+ASGI_APPLICATION = "server.asgi.application"
+# Асинхронные представления каталога, товара, категорий и тегов (для ASGI).
+ASYNC_API_VIEWS = os.getenv("ASYNC_API_VIEWS", "false").lower() == "true"
 
 DATABASES = {
     "default": {
@@ -82,6 +86,50 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения каталога: MYSQL_REPLICA_HOSTS="replica1,replica2".
+DATABASE_REPLICAS = []
+for number, host in enumerate(os.getenv("MYSQL_REPLICA_HOSTS", "").split(","), 1):
+    if host.strip():
+        alias = f"replica_{number}"
+        DATABASES[alias] = {
+            **DATABASES["default"],
+            "HOST": host.strip(),
+            "TEST": {"MIRROR": "default"},
+        }
+        DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["server.db_routing.ReplicaRouter"]
+# round_robin или least_lag (по SHOW REPLICA STATUS).
+DATABASE_REPLICA_STRATEGY = os.getenv("DATABASE_REPLICA_STRATEGY", "round_robin")
+DATABASE_REPLICA_MAX_LAG = 5
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = 5
+# Сколько секунд после записи клиент читает с основной базы.
+DATABASE_REPLICA_PIN_SECONDS = 5
+DATABASE_REPLICA_APPS = ("product", "catalog", "tags")
+DATABASE_REPLICA_PATHS = (
+    "/api/catalog/",
+    "/api/categories/",
+    "/api/product/",
+    "/api/products/",
+    "/api/tags/",
+    "/api/sales/",
+    "/api/banners/",
+)
+
+# LocMemCache у каждого процесса свой: сброс поколений сигналами и
+# командами виден только в этом процессе, остальные воркеры отдают старые
+# данные до истечения TTL ключей. При нескольких воркерах нужен общий кэш
+# с атомарным incr: CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# и CACHE_LOCATION=redis://host:6379.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "megano"),
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -111,7 +159,34 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    # orjson используется, если установлен, иначе стандартный json.
+    "DEFAULT_RENDERER_CLASSES": [
+        "server.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "server.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 MEDIA_URL = "http://127.0.0.1/"
 MEDIA_ROOT = ""
+
+CATALOG_COUNT_CACHE_TIMEOUT = 60
+CATALOG_ESTIMATED_COUNT = False
+CATALOG_FACET_CACHE_TIMEOUT = 300
+CATALOG_FACET_PRICE_BUCKETS = 10
+CATALOG_RESPONSE_CACHE_TIMEOUT = 300
+# TTL справочных ключей (теги, поддеревья категорий, баннеры, скидки).
+CATALOG_LOOKUP_CACHE_TIMEOUT = 300
+# Доля попаданий и промахов, которые пишутся в счётчики статистики.
+CATALOG_CACHE_STATS_SAMPLE_RATE = 0.01
+
+# Веса оценки популярности; после изменения выполнить rebuild_popularity.
+PRODUCT_POPULARITY_WEIGHTS = {"reviews": 1.0, "rating": 1.0, "orders": 2.0}
+PRODUCT_POPULAR_MAX_LIMIT = 20
+PRODUCT_LIMITED_THRESHOLD = 10
+CATALOG_BANNERS_FALLBACK_LIMIT = 3
+CATALOG_EXPORT_CHUNK_SIZE = 500
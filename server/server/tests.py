@@ -0,0 +1,226 @@
+import io
+import json
+import zoneinfo
+from decimal import Decimal
+from unittest import mock
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.urls import reverse
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from tags.models import Tag
+from django.contrib.auth.models import User
+from product.models import Product
+from catalog.models import Category
+from server.parsers import FastJSONParser
+from server.renderers import FastJSONRenderer
+from server.db_routing import PIN_COOKIE, ReplicaRouter, choose_replica
+from server.db_routing import primary_written
+
+
+class FastJSONTest(SimpleTestCase):
+    PAYLOAD = {
+        "items": [
+            {
+                "id": 1,
+                "price": Decimal("500.67"),
+                "rating": 4.5,
+                "title": "Видеокарта\u2028",
+                "date": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+                "moscow": datetime(
+                    2024, 1, 2, 3, 4, 5, tzinfo=zoneinfo.ZoneInfo("Europe/Moscow")
+                ),
+                "naive": datetime(2024, 1, 2, 3, 4, 5),
+                "day": date(2024, 1, 2),
+                "tags": ({"id": 1, "name": "Gaming"},),
+                "images": [],
+                "description": None,
+                "freeDelivery": True,
+            }
+        ],
+        "counts": {1: 2},
+    }
+
+    def test_render_matches_json_renderer(self):
+        """
+        Тестирование совпадения вывода с JSONRenderer.
+        """
+        expected = JSONRenderer().render(self.PAYLOAD)
+        self.assertEqual(FastJSONRenderer().render(self.PAYLOAD), expected)
+        self.assertEqual(
+            FastJSONRenderer().render(self.PAYLOAD, "application/json; indent=4"),
+            JSONRenderer().render(self.PAYLOAD, "application/json; indent=4"),
+        )
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+        # orjson не сериализует целые больше 64 бит: работает JSONRenderer.
+        self.assertEqual(
+            FastJSONRenderer().render([2**70]), b"[1180591620717411303424]"
+        )
+
+    def test_parse(self):
+        """
+        Тестирование разбора JSON и ошибки в теле запроса.
+        """
+        body = json.dumps({"id": 1, "title": "Видеокарта"}).encode()
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b"{"))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"rate": NaN}'))
+
+
+REPLICA = "replica_test"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTest(TestCase):
+    """
+    Реплика в тестах — отдельная пустая база: по содержимому ответа
+    видно, откуда было прочитано.
+    """
+
+    # Реплика подключается в setUpClass, её нет среди баз тестового запуска.
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        replica = {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+        connections.settings[REPLICA] = connections.configure_settings(
+            {"default": replica, REPLICA: replica}
+        )[REPLICA]
+        call_command("migrate", database=REPLICA, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+    def setUp(self):
+        cache.clear()
+        Tag.objects.create(name="Gaming")
+        self.product = Product.objects.create(
+            category=Category.objects.create(title="Phones"),
+            price=Decimal("10.00"),
+            count=5,
+            title="Phone",
+        )
+
+    def get_tags(self, **cookies):
+        self.client.cookies.load(cookies)
+        return self.client.get(reverse("tags")).json()
+
+    def test_catalog_reads_go_to_replica(self):
+        self.assertEqual(self.get_tags(), [])
+
+    def test_reads_outside_catalog_use_primary(self):
+        with self.settings(DATABASE_REPLICA_PATHS=()):
+            self.assertEqual(len(self.get_tags()), 1)
+
+    def test_client_reads_primary_after_write(self):
+        response = self.client.post(
+            reverse("basket"),
+            {"id": self.product.id, "count": 1},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 5)
+        self.assertEqual(len(self.get_tags()), 1)
+
+        self.client.cookies.pop(PIN_COOKIE)
+        self.assertEqual(self.get_tags(), [])
+
+    def test_caches_are_filled_from_primary(self):
+        """
+        Кэши общие для всех клиентов, поэтому заполняются из основной базы,
+        даже когда запрос читает с реплики.
+        """
+        self.product.tags.add(Tag.objects.get(name="Gaming"))
+        url = reverse("catalog")
+        response = self.client.get(url, {"tags": "Gaming"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(
+            [item["id"] for item in response.json()["items"]], [self.product.id]
+        )
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+        self.client.cookies.load({PIN_COOKIE: "1"})
+        response = self.client.get(url, {"tags": "Gaming"})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(len(response.json()["items"]), 1)
+
+        self.client.cookies.pop(PIN_COOKIE)
+        response = self.client.get(url, {"tags": "Gaming", "sort": "price"})
+        self.assertEqual(len(response.json()["items"]), 1)
+        self.assertEqual(self.get_tags(), [])
+
+    def test_cache_table_writes_do_not_pin(self):
+        """
+        Запись в таблицу DatabaseCache не переключает запрос на основную базу.
+        """
+        router = ReplicaRouter()
+        cache_entry = DatabaseCache("megano_cache", {}).cache_model_class
+        token = primary_written.set(False)
+        try:
+            self.assertEqual(router.db_for_write(cache_entry), "default")
+            self.assertFalse(primary_written.get())
+            router.db_for_write(Tag)
+            self.assertTrue(primary_written.get())
+        finally:
+            primary_written.reset(token)
+
+    def test_replica_chosen_once_per_request(self):
+        with mock.patch(
+            "server.db_routing.choose_replica", return_value=REPLICA
+        ) as choose:
+            response = self.client.get(
+                reverse("product-details", args=[self.product.id])
+            )
+        self.assertEqual(response.status_code, 404)
+        choose.assert_called_once_with()
+
+    def test_streaming_export_reads_replica(self):
+        admin = User.objects.create_user(username="admin", is_staff=True)
+        self.client.force_login(admin)
+        response = self.client.get(reverse("catalog-export"))
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+        with self.settings(DATABASE_REPLICA_PATHS=()):
+            response = self.client.get(reverse("catalog-export"))
+        self.assertIn(b'"Phone"', b"".join(response.streaming_content))
+
+    @override_settings(
+        DATABASE_REPLICAS=["replica_a", "replica_b", "replica_c"],
+        DATABASE_REPLICA_MAX_LAG=5,
+    )
+    def test_round_robin(self):
+        lags = {"replica_a": 0, "replica_b": 4, "replica_c": 30}
+        with mock.patch("server.db_routing.replica_lag", lags.get):
+            chosen = {choose_replica() for _ in range(6)}
+        self.assertEqual(chosen, {"replica_a", "replica_b"})
+
+    @override_settings(
+        DATABASE_REPLICAS=["replica_a", "replica_b", "replica_c"],
+        DATABASE_REPLICA_STRATEGY="least_lag",
+        DATABASE_REPLICA_MAX_LAG=5,
+    )
+    def test_least_lag(self):
+        lags = {"replica_a": 3, "replica_b": 1, "replica_c": None}
+        with mock.patch("server.db_routing.replica_lag", lags.get):
+            self.assertEqual({choose_replica() for _ in range(3)}, {"replica_b"})
+
+        lags = {"replica_a": 30, "replica_b": 10, "replica_c": None}
+        with mock.patch("server.db_routing.replica_lag", lags.get):
+            self.assertIsNone(choose_replica())
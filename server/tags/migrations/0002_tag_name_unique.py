@@ -0,0 +1,44 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:44
+
+from django.db import migrations, models
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """
+    Перед добавлением уникального индекса оставляет по одному тегу
+    на имя (без учёта регистра) и переносит на него связи с товарами.
+    """
+    Tag = apps.get_model("tags", "Tag")
+    ProductTag = apps.get_model("product", "Product").tags.through
+
+    kept = {}
+    for tag in Tag.objects.order_by("id"):
+        keeper = kept.setdefault(tag.name.lower(), tag)
+        if keeper.id == tag.id:
+            continue
+        linked = set(
+            ProductTag.objects.filter(tag_id=keeper.id).values_list(
+                "product_id", flat=True
+            )
+        )
+        for link in ProductTag.objects.filter(tag_id=tag.id):
+            if link.product_id not in linked:
+                ProductTag.objects.create(product_id=link.product_id, tag_id=keeper.id)
+        tag.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tags", "0001_initial"),
+        ("product", "0009_product_sort_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="tag",
+            name="name",
+            field=models.CharField(max_length=50, unique=True),
+        ),
+    ]
@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.urls import path
 
-from tags.views import TagsDetailsAPIView
+from tags.views import AsyncTagsDetailsAPIView, TagsDetailsAPIView
+
+tags_view = AsyncTagsDetailsAPIView if settings.ASYNC_API_VIEWS else TagsDetailsAPIView
 
 
 urlpatterns = [
-    path("tags/", TagsDetailsAPIView.as_view(), name="tags"),
+    path("tags/", tags_view.as_view(), name="tags"),
 ]
@@ -1,9 +1,21 @@
+from rest_framework.response import Response
 from rest_framework.generics import ListAPIView
 
 from tags.models import Tag
 from tags.serializers import TagSerializer
+from server.async_views import AsyncAPIView, alist
 
 
 class TagsDetailsAPIView(ListAPIView):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+
+
+class AsyncTagsDetailsAPIView(AsyncAPIView, TagsDetailsAPIView):
+    """
+    Асинхронный вариант TagsDetailsAPIView для запуска под ASGI.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        tags = await alist(self.get_queryset())
+        return Response(self.get_serializer(tags, many=True).data)